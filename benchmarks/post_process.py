@@ -0,0 +1,114 @@
+"""Benchmark record transformers against the previous `post_process` implementation.
+
+Run with `python -m benchmarks.post_process`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import time
+import typing as t
+
+from tap_iterable import streams
+from tap_iterable.tap import TapIterable
+
+
+class _LegacyEmailSendStream(streams.EmailSendStream):
+    def post_process(self, row, context=None):  # noqa: ARG002
+        if transactional_data := row.get("transactionalData"):
+            row["transactionalData"] = json.loads(transactional_data)
+
+        return row
+
+
+class _LegacyUsersStream(streams.UsersStream):
+    def post_process(self, row, context=None):  # noqa: ARG002
+        if transactional_data := row.get("transactionalData"):
+            row["transactionalData"] = json.loads(transactional_data)
+
+        data_fields = {
+            f: row.pop(f) for f in row.copy() if f not in self.schema["properties"]
+        }
+
+        return {**row, "dataFields": data_fields}
+
+
+def _email_send_record(i: int) -> dict:
+    return {
+        "createdAt": "2024-01-01 00:00:00 +00:00",
+        "messageId": f"message-{i}",
+        "email": f"user{i}@example.com",
+        "campaignId": i % 100,
+        "templateId": i % 50,
+        "messageTypeId": 1,
+        "transactionalData": '{"orderId": 1}' if i % 10 == 0 else None,
+    }
+
+
+def _users_record(i: int) -> dict:
+    return {
+        "email": f"user{i}@example.com",
+        "userId": str(i),
+        "profileUpdatedAt": "2024-01-01 00:00:00 +00:00",
+        "signupDate": "2024-01-01 00:00:00 +00:00",
+        "userListIds": [1, 2, 3],
+        **{f"customField{n}": n for n in range(20)},
+    }
+
+
+def _records_per_second(
+    post_process: t.Callable[[dict], dict],
+    make_record: t.Callable[[int], dict],
+    count: int,
+    repeat: int = 5,
+) -> float:
+    timings = []
+
+    for _ in range(repeat):
+        records = [make_record(i) for i in range(count)]
+
+        gc.disable()
+        start = time.perf_counter()
+
+        for record in records:
+            post_process(record)
+
+        timings.append(time.perf_counter() - start)
+        gc.enable()
+
+    return count / min(timings)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=200_000)
+    args = parser.parse_args()
+
+    tap = TapIterable(config={"api_key": "benchmark"}, validate_config=False)
+
+    benchmarks = {
+        "email_send": (
+            _LegacyEmailSendStream(tap).post_process,
+            tap.streams["email_send"].record_transformer,
+            _email_send_record,
+        ),
+        "users": (
+            _LegacyUsersStream(tap).post_process,
+            tap.streams["users"].record_transformer,
+            _users_record,
+        ),
+    }
+
+    for name, (legacy, current, make_record) in benchmarks.items():
+        before = _records_per_second(legacy, make_record, args.records)
+        after = _records_per_second(current, make_record, args.records)
+        print(  # noqa: T201
+            f"{name}: {before:,.0f} -> {after:,.0f} records/s ({after / before:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
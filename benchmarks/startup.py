@@ -0,0 +1,122 @@
+"""Benchmark tap startup time for `--about`, `--discover` and small syncs.
+
+Each command is run in a fresh process, as orchestrators launch the tap. Most of
+the time is spent importing the Singer SDK, so time to load streams for a sync is
+also measured after import. Run with `python -m benchmarks.startup`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CONFIG = {"api_key": "benchmark"}
+
+# seconds after import to start the tap and load streams for a single selected stream
+SYNC_STARTUP_TARGET = 0.1
+
+_SYNC_STARTUP = """
+import json, sys, time
+from tap_iterable.tap import TapIterable
+start = time.perf_counter()
+tap = TapIterable(
+    config=json.loads(sys.argv[1]),
+    catalog=json.loads(open(sys.argv[2]).read()),
+    validate_config=False,
+)
+tap.streams
+print(time.perf_counter() - start)
+"""
+
+
+def _catalog(selected: str) -> dict:
+    # imported here rather than at module level, so it is not measured
+    from tap_iterable.tap import TapIterable
+
+    catalog = TapIterable(config=CONFIG).catalog_dict
+
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if not metadata["breadcrumb"]:
+                metadata["metadata"]["selected"] = entry["tap_stream_id"] == selected
+
+    return catalog
+
+
+def _run(args: list[str], repeat: int) -> tuple[list[float], list[str]]:
+    timings = []
+    outputs = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.run(  # noqa: S603 - trusted benchmark commands
+            args,
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        timings.append(time.perf_counter() - start)
+        outputs.append(process.stdout)
+
+    return timings, outputs
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--stream", default="email_send")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        catalog_path = Path(tmpdir) / "catalog.json"
+        catalog_path.write_text(json.dumps(_catalog(args.stream)))
+
+        commands = {
+            "import": [sys.executable, "-c", "import tap_iterable.tap"],
+            "about": [sys.executable, "-m", "tap_iterable", "--about"],
+            "discover": [
+                sys.executable,
+                "-c",
+                (
+                    "import json, sys\n"
+                    "from tap_iterable.tap import TapIterable\n"
+                    "TapIterable(config=json.loads(sys.argv[1])).catalog_dict"
+                ),
+                json.dumps(CONFIG),
+            ],
+            "sync_startup": [
+                sys.executable,
+                "-c",
+                _SYNC_STARTUP,
+                json.dumps(CONFIG),
+                str(catalog_path),
+            ],
+        }
+
+        results = {
+            name: _run(command, args.repeat) for name, command in commands.items()
+        }
+
+    for name, (timings, _) in results.items():
+        print(f"{name}: {statistics.median(timings) * 1000:.0f} ms")  # noqa: T201
+
+    _, outputs = results["sync_startup"]
+    sync_startup = statistics.median(float(output) for output in outputs)
+    print(f"sync_startup after import: {sync_startup * 1000:.0f} ms")  # noqa: T201
+
+    if sync_startup > SYNC_STARTUP_TARGET:
+        sys.exit(
+            "Sync startup exceeded target of "
+            f"{SYNC_STARTUP_TARGET * 1000:.0f} ms after import"
+        )
+
+
+if __name__ == "__main__":
+    main()
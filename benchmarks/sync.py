@@ -0,0 +1,249 @@
+"""Benchmark stream syncs against a local fake Iterable API.
+
+Each case syncs its streams in a separate process, so peak memory is measured
+independently. Run with `python -m benchmarks.sync`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+import typing as t
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from tap_iterable import streams
+from tap_iterable.client import IterableStream
+from tap_iterable.tap import TapIterable
+from tests.fake_iterable import FakeIterable
+
+START_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+# selected streams and config, by case name
+CASES: dict[str, tuple[tuple[str, ...], dict[str, t.Any]]] = {
+    "export": (("email_send",), {}),
+    "export_streamed": (("email_send",), {"stream_exports": True}),
+    "export_parallel": (("email_send",), {"max_parallel_downloads": 4}),
+    "export_job": (("email_send",), {"export_engine": "job"}),
+    "export_jsonl_batches": (
+        ("email_send",),
+        {"batch_config": {"encoding": {"format": "jsonl"}, "batch_size": 100_000}},
+    ),
+    "export_parquet_batches": (
+        ("email_send",),
+        {"batch_config": {"encoding": {"format": "parquet"}, "batch_size": 100_000}},
+    ),
+    "export_decode_workers": (("email_send",), {"export_decode_workers": 4}),
+    "users": (("users",), {}),
+    "users_decode_workers": (("users",), {"export_decode_workers": 4}),
+    "list_users": (("list_users",), {"max_parallel_requests": 4}),
+    "email_templates": (("email_templates",), {"max_parallel_requests": 4}),
+    "metadata": (("metadata",), {"max_parallel_requests": 4}),
+}
+
+
+class _RecordCounter(io.TextIOBase):
+    """Discard Singer messages written to stdout, counting RECORD messages."""
+
+    record_count = 0
+
+    def write(self, s: str) -> int:
+        if s.startswith('{"type":"RECORD"'):
+            self.record_count += 1
+
+        return len(s)
+
+
+def _catalog(config: dict, selected: t.Iterable[str]) -> dict:
+    catalog = TapIterable(config=config, validate_config=False).catalog_dict
+
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if not metadata["breadcrumb"]:
+                metadata["metadata"]["selected"] = entry["tap_stream_id"] in selected
+
+    return catalog
+
+
+def _peak_rss_mb() -> float:
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # reported in bytes on macOS, otherwise kilobytes
+    if sys.platform == "darwin":
+        return peak_rss / 1000**2
+
+    return peak_rss * 1024 / 1000**2
+
+
+def run_case(api_url: str, selected: tuple[str, ...], config: dict) -> dict:
+    """Sync streams against the fake API and measure throughput.
+
+    Args:
+        api_url: Base URL of the fake API.
+        selected: Names of the streams to select.
+        config: Tap config.
+
+    Returns:
+        Records synced, seconds taken, bytes downloaded and peak RSS in MB.
+    """
+    IterableStream.url_base = api_url
+    streams._ExportStream.export_job_poll_interval = 0  # noqa: SLF001
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if batch_config := config.get("batch_config"):
+            batch_config["storage"] = {"root": f"file://{tmpdir}"}
+
+        tap = TapIterable(
+            config=config,
+            catalog=_catalog(config, selected),
+            validate_config=False,
+        )
+
+        sys.stdout = output = _RecordCounter()
+
+        start = time.perf_counter()
+        tap.sync_all()
+        seconds = time.perf_counter() - start
+
+        sys.stdout = sys.__stdout__
+
+    iterable_streams = [
+        s for s in tap.streams.values() if isinstance(s, IterableStream)
+    ]
+
+    return {
+        # records written to batch files are not emitted as RECORD messages
+        "records": output.record_count
+        or sum(s.sync_stats.records_decoded for s in iterable_streams),
+        "seconds": seconds,
+        "bytes": sum(s.sync_stats.bytes_downloaded for s in iterable_streams),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        before = baseline[name]["records_per_second"]
+        after = result["records_per_second"]
+
+        if after < before * (1 - tolerance):
+            regressions.append(f"{name}: {before:,.0f} -> {after:,.0f} records/s")
+
+    return regressions
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "cases",
+        nargs="*",
+        help=f"Cases to run, otherwise all of: {', '.join(CASES)}",
+    )
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--records-per-hour", type=int, default=1000)
+    parser.add_argument("--export-window-hours", type=int, default=24)
+    parser.add_argument("--lists", type=int, default=20)
+    parser.add_argument("--list-users", type=int, default=50_000)
+    parser.add_argument("--templates", type=int, default=500)
+    parser.add_argument("--metadata-tables", type=int, default=10)
+    parser.add_argument("--metadata-keys", type=int, default=50)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="Seconds the fake API waits before responding to each request",
+    )
+    parser.add_argument("--output", type=Path, help="Write results to a JSON file")
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="Fail if records/s regressed compared to results in a JSON file",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Fraction by which records/s may regress from the baseline",
+    )
+    args = parser.parse_args()
+
+    if unknown := set(args.cases) - set(CASES):
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    end_date = START_DATE + timedelta(days=args.days)
+    base_config = {
+        "api_key": "benchmark",
+        "start_date": START_DATE.isoformat(),
+        "end_date": end_date.isoformat(),
+        "export_window_hours": args.export_window_hours,
+        # per-stream and per-window METRIC log lines would drown out the results
+        "metrics_log_level": "WARNING",
+    }
+
+    fake_iterable = FakeIterable(
+        start_date=START_DATE,
+        end_date=end_date,
+        records_per_hour=args.records_per_hour,
+        latency=args.latency,
+        lists=args.lists,
+        list_users=args.list_users,
+        metadata_tables=args.metadata_tables,
+        metadata_keys=args.metadata_keys,
+        templates=args.templates,
+    )
+
+    results = {}
+
+    # spawn a fresh process per case, so peak RSS is not carried over
+    mp_context = multiprocessing.get_context("spawn")
+
+    with fake_iterable as api:
+        for name in args.cases or CASES:
+            selected, config = CASES[name]
+
+            # an executor rather than a pool, whose daemonic workers cannot start
+            # processes of their own (e.g. `export_decode_workers`)
+            with ProcessPoolExecutor(1, mp_context=mp_context) as executor:
+                result = executor.submit(
+                    run_case,
+                    api.api_url,
+                    selected,
+                    {**base_config, **config},
+                ).result()
+
+            result["records_per_second"] = result["records"] / result["seconds"]
+            result["mb_per_second"] = result["bytes"] / 1000**2 / result["seconds"]
+            results[name] = result
+
+            print(  # noqa: T201
+                f"{name}: {result['records']:,} records in {result['seconds']:.2f}s "
+                f"({result['records_per_second']:,.0f} records/s, "
+                f"{result['mb_per_second']:.1f} MB/s, "
+                f"peak RSS {result['peak_rss_mb']:.0f} MB)"
+            )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+
+        if regressions := _regressions(results, baseline, args.tolerance):
+            sys.exit("Regressed:\n" + "\n".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""Singer BATCH file writing for export streams."""
+
+from __future__ import annotations
+
+import gzip
+import typing as t
+from datetime import datetime
+from functools import cached_property
+
+import fs
+import simplejson
+from typing_extensions import Self
+
+from tap_iterable import columnar
+
+if t.TYPE_CHECKING:
+    import pyarrow as pa  # type: ignore[import-not-found, import-untyped]
+    from fs.base import FS
+    from singer_sdk.helpers._batch import BatchConfig
+
+
+class JSONLinesBatchWriter:
+    """Write records to JSON Lines batch files in a batch storage target.
+
+    Records are serialised straight into the current batch file as they are written,
+    so no more than one record is held in memory at a time. Each file is closed and
+    returned as a single-file manifest by `flush`, ready to be emitted in a BATCH
+    message.
+    """
+
+    # balance size and speed, as batch files may be uploaded (e.g. to S3)
+    compresslevel = 6
+
+    def __init__(self, batch_config: BatchConfig, *, prefix: str) -> None:
+        """Initialise the writer.
+
+        Args:
+            batch_config: Batch configuration, defining the storage target and
+                compression of batch files.
+            prefix: Prefix for batch file names, after any storage prefix.
+        """
+        self.batch_config = batch_config
+        self.prefix = f"{batch_config.storage.prefix or ''}{prefix}"
+
+        self._raw_file: t.BinaryIO | None = None
+        self._file: t.BinaryIO | gzip.GzipFile | None = None
+        self._filename = ""
+        self._count = 0
+        self._index = 0
+
+    @property
+    def compression(self) -> str:
+        """Compression format of batch files."""
+        return self.batch_config.encoding.compression or "none"
+
+    def __len__(self) -> int:
+        """Number of records written to the current batch file."""
+        return self._count
+
+    def __enter__(self) -> Self:  # noqa: D105
+        return self
+
+    def __exit__(self, *args) -> None:  # noqa: D105
+        self.close()
+
+    def write(self, record: dict) -> None:
+        """Write a record to the current batch file, starting one if needed.
+
+        Args:
+            record: Record to write.
+        """
+        file = self._file or self._open()
+        file.write(_serialize_json(record).encode() + b"\n")
+        self._count += 1
+
+    def flush(self) -> list[str] | None:
+        """Close the current batch file.
+
+        Returns:
+            A manifest of the batch file URL, or `None` if no records were written
+            since the last flush.
+        """
+        if self._file is None:
+            return None
+
+        self._close_file()
+        url = self._fs.geturl(self._filename)
+
+        self._filename = ""
+        self._count = 0
+
+        return [url]
+
+    def close(self) -> None:
+        """Discard any unflushed batch file and release the storage target."""
+        if self._file is not None:
+            self._close_file()
+            self._fs.remove(self._filename)
+
+        # only opened once a batch file is written
+        if "_fs" in self.__dict__:
+            self._fs.close()
+            del self._fs
+
+    @cached_property
+    def _fs(self) -> FS:
+        return _open_fs(self.batch_config)
+
+    def _open(self) -> t.BinaryIO | gzip.GzipFile:
+        self._index += 1
+        extension = ".json.gz" if self.compression == "gzip" else ".json"
+        self._filename = f"{self.prefix}-{self._index}{extension}"
+
+        raw_file = self._fs.openbin(self._filename, "w")
+        file: t.BinaryIO | gzip.GzipFile = raw_file
+
+        if self.compression == "gzip":
+            file = gzip.GzipFile(
+                fileobj=raw_file,
+                mode="wb",
+                compresslevel=self.compresslevel,
+            )
+
+        self._raw_file = raw_file
+        self._file = file
+
+        return file
+
+    def _close_file(self) -> None:
+        # closing a `GzipFile` does not close the underlying file
+        if self._file is not None:
+            self._file.close()
+
+        if self._raw_file is not None:
+            self._raw_file.close()
+
+        self._file = None
+        self._raw_file = None
+
+
+class ParquetBatchWriter:
+    """Write records or Arrow tables to Parquet batch files in a batch storage target.
+
+    Records are held in memory, in columnar form where written as tables, until they
+    are written to a batch file by `flush`. Column types are unified across tables
+    where possible, otherwise tables are written to separate files of the same batch.
+    """
+
+    def __init__(self, batch_config: BatchConfig, *, prefix: str) -> None:
+        """Initialise the writer.
+
+        Args:
+            batch_config: Batch configuration, defining the storage target and
+                compression of batch files.
+            prefix: Prefix for batch file names, after any storage prefix.
+        """
+        self.batch_config = batch_config
+        self.prefix = f"{batch_config.storage.prefix or ''}{prefix}"
+
+        # fail early, rather than when the first batch is written
+        columnar.import_pyarrow("pyarrow.parquet")
+
+        self._tables: list[pa.Table] = []
+        self._records: list[dict] = []
+        self._count = 0
+        self._index = 0
+
+    def __len__(self) -> int:
+        """Number of records written to the current batch."""
+        return self._count
+
+    def __enter__(self) -> Self:  # noqa: D105
+        return self
+
+    def __exit__(self, *args) -> None:  # noqa: D105
+        self.close()
+
+    def write(self, record: dict) -> None:
+        """Write a record to the current batch.
+
+        Args:
+            record: Record to write.
+        """
+        self._records.append(record)
+        self._count += 1
+
+    def write_table(self, table: pa.Table) -> None:
+        """Write a table of records to the current batch.
+
+        Args:
+            table: Table to write.
+        """
+        self._flush_records()
+        self._tables.append(table)
+        self._count += table.num_rows
+
+    def flush(self) -> list[str] | None:
+        """Write the current batch to batch files.
+
+        Returns:
+            A manifest of batch file URLs, or `None` if no records were written since
+            the last flush.
+        """
+        if not self._count:
+            return None
+
+        self._flush_records()
+        manifest = [self._write_file(t) for t in _concat_tables(self._tables)]
+
+        self._tables = []
+        self._count = 0
+
+        return manifest
+
+    def close(self) -> None:
+        """Discard any unflushed records and release the storage target."""
+        self._tables = []
+        self._records = []
+        self._count = 0
+
+        # only opened once a batch is flushed
+        if "_fs" in self.__dict__:
+            self._fs.close()
+            del self._fs
+
+    @cached_property
+    def _fs(self) -> FS:
+        return _open_fs(self.batch_config)
+
+    def _flush_records(self) -> None:
+        if not self._records:
+            return
+
+        pa = columnar.import_pyarrow()
+
+        self._tables.append(pa.Table.from_pylist(self._records))
+        self._records = []
+
+    def _write_file(self, table: pa.Table) -> str:
+        pq = columnar.import_pyarrow("pyarrow.parquet")
+
+        self._index += 1
+        filename = f"{self.prefix}-{self._index}.parquet"
+
+        # as for the SDK Parquet batcher, otherwise use the `pyarrow` default (snappy)
+        options = {}
+        if self.batch_config.encoding.compression == "gzip":
+            options["compression"] = "gzip"
+
+        with self._fs.openbin(filename, "w") as f:
+            pq.write_table(table, f, **options)
+
+        return self._fs.geturl(filename)
+
+
+def _open_fs(batch_config: BatchConfig) -> FS:
+    storage_url = batch_config.storage.fs_url.geturl()
+    return fs.open_fs(storage_url, writeable=True, create=True)
+
+
+def _concat_tables(tables: list[pa.Table]) -> list[pa.Table]:
+    pa = columnar.import_pyarrow()
+
+    concatenated = [tables[0]]
+
+    for table in tables[1:]:
+        try:
+            concatenated[-1] = pa.concat_tables(
+                [concatenated[-1], table],
+                promote_options="permissive",
+            )
+        except (pa.ArrowInvalid, pa.ArrowTypeError):  # noqa: PERF203 - incompatible schemas
+            concatenated.append(table)
+
+    return concatenated
+
+
+def _serialize_json(record: dict) -> str:
+    # as records are serialised in RECORD messages, so batch files hold the same JSON
+    # (e.g. decimal numbers are written exactly)
+    return simplejson.dumps(
+        record,
+        use_decimal=True,
+        default=_default_encoding,
+        separators=(",", ":"),
+    )
+
+
+def _default_encoding(obj: t.Any) -> str:  # noqa: ANN401
+    return obj.isoformat(sep="T") if isinstance(obj, datetime) else str(obj)
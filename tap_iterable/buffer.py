@@ -0,0 +1,238 @@
+"""Response buffering for streamed exports."""
+
+from __future__ import annotations
+
+import contextlib
+import tempfile
+import threading
+import time
+import typing as t
+from collections import deque
+
+from typing_extensions import Self
+
+if t.TYPE_CHECKING:
+    import requests
+
+
+class SpillBuffer:
+    """Bounded in-memory buffer of response content that spills to disk when full.
+
+    Content is downloaded independently of consumption (see `start` and `download`)
+    so the connection is drained at full speed regardless of how quickly records are
+    consumed. Chunks are held in memory until `max_memory` bytes are buffered, after
+    which all subsequent chunks are written to a temporary file and read back in
+    order.
+    """
+
+    # seconds to wait for a download to stop once closed, after which any content
+    # still being received is discarded
+    close_timeout = 1.0
+
+    def __init__(
+        self,
+        *,
+        max_memory: int,
+        chunk_size: int = 1024**2,  # 1 MB
+        prefix: str | None = None,
+        directory: str | None = None,
+    ) -> None:
+        """Initialise the buffer.
+
+        Args:
+            max_memory: Maximum number of bytes to hold in memory.
+            chunk_size: Number of bytes to read from the response at a time.
+            prefix: Prefix for the spill file name.
+            directory: Directory to create the spill file in, otherwise the default
+                temporary directory.
+        """
+        self.max_memory = max_memory
+        self.chunk_size = chunk_size
+        self.prefix = prefix
+        self.directory = directory
+
+        self.size = 0
+        self.download_duration = 0.0
+        self.spill_duration = 0.0
+
+        self._condition = threading.Condition()
+        self._chunks: deque[bytes] = deque()
+        self._memory_size = 0
+        self._spill_file: t.IO[bytes] | None = None
+        self._spill_size = 0
+        self._spill_position = 0
+        self._started = False
+        self._done = False
+        self._closed = False
+        self._error: BaseException | None = None
+        self._response: requests.Response | None = None
+
+    @property
+    def spilled(self) -> bool:
+        """Whether the consumer fell behind and content was spilled to disk."""
+        return self._spill_file is not None
+
+    @property
+    def spill_size(self) -> int:
+        """Number of bytes spilled to disk."""
+        return self._spill_size
+
+    def __enter__(self) -> Self:  # noqa: D105
+        return self
+
+    def __exit__(self, *args) -> None:  # noqa: D105
+        self.close()
+
+    def close(self) -> None:
+        """Stop any in-progress download and discard buffered content."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            response = self._response
+
+        # a download stalled waiting for content would otherwise only stop once the
+        # read times out
+        if response is not None:
+            with contextlib.suppress(Exception):
+                response.close()
+
+        with self._condition:
+            # wait briefly for an in-progress download to stop before cleaning up
+            self._condition.wait_for(
+                lambda: self._done or not self._started,
+                timeout=self.close_timeout,
+            )
+
+            if self._spill_file:
+                self._spill_file.close()
+
+    def start(self, response: requests.Response) -> None:
+        """Download response content into the buffer in a background thread.
+
+        Args:
+            response: A streaming HTTP response.
+        """
+        threading.Thread(target=self.download, args=(response,), daemon=True).start()
+
+    def download(self, response: requests.Response) -> None:
+        """Download response content into the buffer.
+
+        Blocks until the response is fully downloaded or the buffer is closed. Any
+        error is raised to the consumer instead.
+
+        Args:
+            response: A streaming HTTP response.
+        """
+        with self._condition:
+            if self._closed:
+                response.close()
+                return
+
+            self._started = True
+            self._response = response
+
+        start = time.perf_counter()
+
+        try:
+            with response:  # ensure connection is eventually released
+                for chunk in response.iter_content(self.chunk_size):
+                    if self._closed:
+                        return
+
+                    self._put(chunk)
+        except BaseException as e:  # noqa: BLE001
+            self.fail(e)
+        finally:
+            self.download_duration = time.perf_counter() - start
+
+            with self._condition:
+                self._done = True
+                self._condition.notify_all()
+
+    def fail(self, error: BaseException) -> None:
+        """Stop the download and raise an error to the consumer.
+
+        Args:
+            error: The error to raise.
+        """
+        with self._condition:
+            self._error = error
+            self._done = True
+            self._condition.notify_all()
+
+    def _put(self, chunk: bytes) -> None:
+        with self._condition:
+            # content received after closing (see `close_timeout`) is discarded
+            if self._closed:
+                return
+
+            fits_in_memory = self._memory_size + len(chunk) <= self.max_memory
+            self.size += len(chunk)
+
+            if not self._spill_file and fits_in_memory:
+                self._chunks.append(chunk)
+                self._memory_size += len(chunk)
+            else:
+                # once spilled, keep writing to disk to preserve chunk order
+                if not self._spill_file:
+                    self._spill_file = tempfile.TemporaryFile(  # noqa: SIM115
+                        prefix=self.prefix,
+                        dir=self.directory,
+                    )
+
+                start = time.perf_counter()
+                self._spill_file.seek(self._spill_size)
+                self._spill_file.write(chunk)
+                self.spill_duration += time.perf_counter() - start
+                self._spill_size += len(chunk)
+
+            self._condition.notify_all()
+
+    def _readable(self) -> bool:
+        unread_spill = self._spill_position < self._spill_size
+        return bool(self._chunks) or unread_spill or self._done
+
+    def _get(self) -> bytes:
+        with self._condition:
+            self._condition.wait_for(self._readable)
+
+            if self._chunks:
+                chunk = self._chunks.popleft()
+                self._memory_size -= len(chunk)
+                return chunk
+
+            if self._spill_file and self._spill_position < self._spill_size:
+                self._spill_file.seek(self._spill_position)
+                chunk = self._spill_file.read(self.chunk_size)
+                self._spill_position += len(chunk)
+                return chunk
+
+        if self._error:
+            raise self._error
+
+        return b""
+
+    def iter_content(self) -> t.Iterator[bytes]:
+        """Iterate over buffered response content.
+
+        Yields:
+            Chunks of response content, in order.
+        """
+        while chunk := self._get():
+            yield chunk
+
+    def iter_lines(self) -> t.Iterator[bytes]:
+        """Iterate over buffered response content line by line.
+
+        Yields:
+            Each non-empty line of response content.
+        """
+        pending = b""
+
+        for chunk in self.iter_content():
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            yield from filter(None, lines)
+
+        if pending:
+            yield pending
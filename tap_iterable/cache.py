@@ -0,0 +1,104 @@
+"""Persistent response content caching."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+
+class ContentCache:
+    """Size-bound cache of response content on disk, evicted least recently used.
+
+    Entries are stored as one file per key, with file modification times tracking
+    recency of use so the cache persists across runs.
+    """
+
+    suffix = ".cache"
+
+    def __init__(self, directory: str | os.PathLike, *, max_entries: int) -> None:
+        """Initialise the cache.
+
+        Args:
+            directory: Directory to store cached content in, created if it does not
+                exist.
+            max_entries: Maximum number of entries to keep.
+        """
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._size = sum(1 for _ in self.directory.glob(f"*{self.suffix}"))
+
+    def __len__(self) -> int:  # noqa: D105
+        return self._size
+
+    def get(self, key: str) -> bytes | None:
+        """Get cached content.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            The cached content, or `None` if there is no (non-empty) entry for the
+            key.
+        """
+        path = self._path(key)
+
+        # held so the entry is not evicted between reading it and marking it as
+        # recently used (which would otherwise fail, rather than recreate it)
+        with self._lock:
+            try:
+                content = path.read_bytes()
+                os.utime(path)  # mark as recently used
+            except FileNotFoundError:
+                return None
+
+        # content is never empty, so an empty entry (e.g. recreated by marking an
+        # evicted entry as recently used) is not valid
+        return content or None
+
+    def put(self, key: str, content: bytes) -> None:
+        """Cache content, evicting the least recently used entries if full.
+
+        Args:
+            key: Cache key.
+            content: Content to cache.
+        """
+        path = self._path(key)
+
+        # write to a temporary file first so partially-written entries are never read
+        with tempfile.NamedTemporaryFile(dir=self.directory, delete=False) as f:
+            f.write(content)
+
+        with self._lock:
+            exists = path.exists()
+            Path(f.name).replace(path)
+
+            if not exists:
+                self._size += 1
+
+            if self._size > self.max_entries:
+                self._evict()
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.directory / f"{digest}{self.suffix}"
+
+    def _evict(self) -> None:
+        paths = sorted(
+            self.directory.glob(f"*{self.suffix}"),
+            key=lambda p: p.stat().st_mtime_ns,
+        )
+
+        # evict down to 90% capacity so a full cache is not rescanned on every put
+        excess = len(paths) - int(self.max_entries * 0.9)
+
+        for path in paths[:excess]:
+            path.unlink(missing_ok=True)
+
+        self._size = len(paths) - max(excess, 0)
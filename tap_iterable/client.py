@@ -2,22 +2,33 @@
 
 from __future__ import annotations
 
-import decimal
+import contextlib
+import json
+import time
 import typing as t
-from datetime import datetime, timezone
-from functools import cached_property
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, cached_property
+from http import HTTPStatus
 from importlib import resources
+from pathlib import Path
+from urllib.parse import urlparse
 
-from singer_sdk.authenticators import APIKeyAuthenticator
+import requests
+from singer_sdk.exceptions import AbortedSyncExceptionBase
 from singer_sdk.helpers.jsonpath import extract_jsonpath
 from singer_sdk.pagination import BaseAPIPaginator  # noqa: TC002
 from singer_sdk.streams import RESTStream
 from typing_extensions import override
 
+from tap_iterable import decoders, profiling, ratelimit, stats, transformers, transport
+
 if t.TYPE_CHECKING:
-    import requests
+    from backoff.types import Details
     from singer_sdk.helpers.types import Context
 
+    from tap_iterable.tap import TapIterable
+
 
 SCHEMAS_DIR = resources.files(__package__) / "schemas"
 
@@ -25,9 +36,34 @@ SCHEMAS_DIR = resources.files(__package__) / "schemas"
 class IterableStream(RESTStream):
     """Iterable stream class."""
 
+    _tap: TapIterable
+
     # Update this value if necessary or override `get_new_paginator`.
     next_page_token_jsonpath = "$.next_page"  # noqa: S105
 
+    # whether to defer downloading response content until it is accessed
+    stream_response = False
+
+    # whether records for multiple contexts can be requested concurrently, ahead of
+    # being synced (see `prefetch`)
+    parallel_contexts = False
+
+    # whether requests are filtered by the bookmark, so records can only be requested
+    # once the stream is synced (as the starting replication value is written to
+    # state), rather than ahead of it (see `prefetch_sync`)
+    filtered_by_bookmark = False
+
+    # whether records from `request_records` are already transformed by the record
+    # transformer (e.g. in worker processes), rather than by `get_records`
+    records_transformed = False
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Initialise the stream."""
+        super().__init__(*args, **kwargs)
+
+        # created up front, as requests may be made from multiple threads
+        self.sync_stats = stats.SyncStats()
+
     @override
     @cached_property
     def url_base(self):
@@ -36,15 +72,25 @@ class IterableStream(RESTStream):
 
         return "https://api.iterable.com/api"
 
+    @property
+    def transport(self) -> transport.Transport:
+        """HTTP transport shared by all streams of the tap."""
+        return self._tap.transport
+
+    @override
+    @property
+    def requests_session(self):
+        return self.transport.session
+
     @override
     @property
     def authenticator(self):
-        return APIKeyAuthenticator.create_for_stream(
-            self,
-            key="Api-Key",
-            value=self.config["api_key"],
-            location="header",
-        )
+        return self.transport.get_authenticator(self)
+
+    @override
+    @property
+    def timeout(self):
+        return self.transport.timeout
 
     @property
     def http_headers(self) -> dict:
@@ -94,24 +140,79 @@ class IterableStream(RESTStream):
             params["order_by"] = self.replication_key
         return params
 
-    def prepare_request_payload(
-        self,
-        context: Context | None,  # noqa: ARG002
-        next_page_token: t.Any | None,  # noqa: ARG002, ANN401
-    ) -> dict | None:
-        """Prepare the data payload for the REST API request.
+    @override
+    def _request(self, prepared_request, context):
+        bucket = self._get_rate_limit_bucket(prepared_request)
+
+        if bucket:
+            bucket.acquire()
+
+        start = time.perf_counter()
+
+        try:
+            response = self.requests_session.send(
+                prepared_request,
+                stream=self.stream_response,
+                timeout=self.timeout,
+                allow_redirects=self.allow_redirects,
+            )
+        except requests.exceptions.ConnectionError as e:
+            # requests aborted by closing the transport are not retried
+            if self.transport.closed:
+                msg = "Request aborted as the transport was closed"
+                raise transport.TransportClosedError(msg) from e
+
+            raise
+
+        # responses are recorded once, where their content is downloaded, so streamed
+        # responses are recorded as they are read (e.g. per export window)
+        if not self.stream_response:
+            # content is already downloaded by the time the response is returned
+            self.sync_stats.add_response(response)
+            self.sync_stats.add_download(
+                len(response.content),
+                time.perf_counter() - start,
+            )
+
+        if bucket and response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+            bucket.throttle(ratelimit.retry_after(response))
+        elif bucket:
+            bucket.recover()
+
+        self._write_request_duration_log(
+            endpoint=self.path,
+            response=response,
+            context=context,
+            extra_tags={"url": prepared_request.path_url}
+            if self._LOG_REQUEST_METRIC_URLS
+            else None,
+        )
+        self.validate_response(response)
 
-        By default, no payload will be sent (return None).
+        return response
 
-        Args:
-            context: The stream context.
-            next_page_token: The next page index or value.
+    @override
+    def backoff_handler(self, details: Details):
+        self.sync_stats.add_retry()
+        super().backoff_handler(details)
 
-        Returns:
-            A dictionary with the JSON body for a POST requests.
-        """
-        # TODO: Delete this method if no payload is required. (Most REST APIs.)
-        return None
+    @property
+    def rate_limiter(self) -> ratelimit.RateLimiter:
+        """Rate limiter shared by all streams of the tap."""
+        return self._tap.rate_limiter
+
+    def _get_rate_limit_bucket(
+        self,
+        prepared_request: requests.PreparedRequest,
+    ) -> ratelimit.TokenBucket | None:
+        url = urlparse(prepared_request.url or "")
+        base_url = urlparse(self.url_base)
+
+        # only requests to the API are limited (e.g. not export job file downloads)
+        if url.netloc != base_url.netloc or not url.path.startswith(base_url.path):
+            return None
+
+        return self.rate_limiter.get(url.path.removeprefix(base_url.path))
 
     def parse_response(self, response: requests.Response) -> t.Iterable[dict]:
         """Parse the response and return an iterator of result records.
@@ -122,36 +223,420 @@ class IterableStream(RESTStream):
         Yields:
             Each record from the source.
         """
-        # TODO: Parse response body and return a set of records.
-        yield from extract_jsonpath(
-            self.records_jsonpath,
-            input=response.json(parse_float=decimal.Decimal),
+        start = time.perf_counter()
+        records = list(
+            extract_jsonpath(
+                self.records_jsonpath,
+                input=self.json_decoder(response.content),
+            )
         )
 
+        # a response is decoded whole, possibly in a request thread (see
+        # `_start_prefetch`), so is recorded like records decoded into a table
+        self.sync_stats.add_decode(len(records), time.perf_counter() - start)
+
+        yield from records
+
+    @cached_property
+    def temp_dir(self) -> str | None:
+        """Directory for temporary files, if not the system default."""
+        return self.config.get("temp_dir")
+
     @cached_property
-    def _date_time_properties(self):
-        properties: dict[str, dict] = self.schema["properties"]
+    def json_decoder(self) -> decoders.Decoder:
+        """JSON decode function for response content, as configured."""
+        backend = self.config.get("json_decoder", "json")
 
-        return {
-            name
-            for name, schema in properties.items()
-            if schema.get("format") == "date-time"
-        }
+        if backend == "orjson" and self.exact_numbers:
+            self.logger.info(
+                "Falling back to `json` decoder to preserve number precision",
+            )
+
+        return decoders.get_decoder(backend, exact_numbers=self.exact_numbers)
+
+    @cached_property
+    def exact_numbers(self) -> bool:
+        """Whether floating-point numbers must be decoded without loss of precision."""
+        if self.schema_filepath:
+            return _has_number_properties_in_file(str(self.schema_filepath))
+
+        return _has_number_properties(self.schema)
+
+    @cached_property
+    def _date_time_properties(self) -> frozenset[str]:
+        if self.schema_filepath:
+            return _get_date_time_properties_in_file(str(self.schema_filepath))
+
+        return _get_date_time_properties(self.schema)
+
+    @cached_property
+    def record_transformer(self) -> transformers.Transformer:
+        """Record transformer for the stream, built once from its schema."""
+        return self.build_record_transformer()
+
+    def build_record_transformer(self) -> transformers.Transformer:
+        """Build a function to transform each record returned by the API.
+
+        Returns:
+            A record transformer.
+        """
+        return transformers.timestamps_to_iso(self._date_time_properties)
 
     @override
-    def post_process(self, row, context=None):
-        for name in self._date_time_properties:
-            value = row.get(name)
+    def _sync_records(self, context=None, *, write_messages=True):
+        with self._end_sync_on_error():
+            if not self._prepare_sync(context):
+                return
+
+            with self._profile():
+                yield from super()._sync_records(
+                    context,
+                    write_messages=write_messages,
+                )
 
-            if not value:
-                continue
+    @contextlib.contextmanager
+    def _end_sync_on_error(self):
+        try:
+            yield
+        except AbortedSyncExceptionBase:
+            # the record limit was reached (e.g. in a dry run), which the SDK ignores
+            # to go on to sync other streams
+            raise
+        except Exception:
+            # the SDK only logs sync costs (see `log_sync_costs`) once every stream is
+            # synced, so records would otherwise still be requested ahead for streams
+            # that will not be synced
+            self._tap.sync_failed()
+            raise
+
+    def _prepare_sync(self, context: Context | None) -> bool:
+        # contexts no selected stream needs are skipped, rather than requesting
+        # records only to discard them (see `needs_context`)
+        if context and not self.needs_context(context):
+            self.logger.debug("Skipping unneeded context: %s", context)
+            return False
+
+        # requests are only planned in a dry run, not made
+        if self._tap.dry_run:
+            self._tap.log_request_plan()
+            return False
+
+        self._tap.prefetch_streams(self)
+        return True
 
-            if isinstance(value, int):
-                date_time = datetime.fromtimestamp(
-                    value / 1000,  # assume timestamp in milliseconds
-                    tz=timezone.utc,
+    @override
+    def get_replication_key_signpost(self, context):
+        # not kept in state for contexts that are skipped (see `_prepare_sync`)
+        if self._tap.dry_run or (context and not self.needs_context(context)):
+            return None
+
+        return super().get_replication_key_signpost(context)
+
+    @override
+    def log_sync_costs(self):
+        super().log_sync_costs()
+
+        # called for every stream once all streams are synced
+        self._tap.sync_finished(self)
+
+    def _profile(self) -> t.ContextManager[None]:
+        profile_dir = self.config.get("profile_dir")
+
+        # child streams are synced (and so profiled) by their parent stream
+        if not profile_dir or self.parent_stream_type:
+            return contextlib.nullcontext()
+
+        return profiling.profile(
+            self.name,
+            Path(profile_dir),
+            logger=self.logger,
+            top=self.config.get("profile_top", 20),
+        )
+
+    def needs_context(self, context: Context) -> bool:
+        """Whether any selected records could be synced in a context.
+
+        That is, whether the stream is selected or any selected descendant stream
+        needs the contexts it would generate. Contexts that are not needed are
+        skipped, so parent streams only request records that are needed.
+
+        Args:
+            context: Stream context, or the context of a parent stream (so with only
+                some of the keys of a context of this stream).
+
+        Returns:
+            Whether to sync the stream in the context.
+        """
+        if self.selected:
+            return True
+
+        return any(
+            stream.needs_context(context)
+            for stream in self.child_streams
+            if isinstance(stream, IterableStream)
+            and (stream.selected or stream.has_selected_descendents)
+        )
+
+    def estimate_requests(self, context: Context | None) -> int:  # noqa: ARG002
+        """Estimate the number of requests to sync the stream in a context.
+
+        Args:
+            context: Stream context, if known.
+
+        Returns:
+            The minimum number of requests, excluding pagination and retries.
+        """
+        return 1
+
+    @override
+    def _write_record_message(self, record):
+        # includes conforming records to the schema, stream maps and serialisation
+        start = time.perf_counter()
+        super()._write_record_message(record)
+        self.sync_stats.add_emit(time.perf_counter() - start)
+
+    @override
+    def get_records(self, context):
+        records = self.request_records(context)
+
+        # apply the record transformer directly, avoiding `post_process` overhead
+        # unless overridden
+        if not self.records_transformed:
+            records = map(
+                self.sync_stats.timed_post_process(self.record_transformer),
+                records,
+            )
+
+        if self.post_process_overridden:
+            records = self._post_process_records(records, context)
+
+        # child streams requesting records for their contexts in threads, which are
+        # all synced by the time the records of this stream are
+        parallel_streams = [
+            s
+            for s in self.child_streams
+            if isinstance(s, IterableStream)
+            and s.parallel_contexts
+            and (s.selected or s.has_selected_descendents)
+        ]
+        prefetch_streams = [s for s in parallel_streams if s.max_parallel_requests > 1]
+
+        try:
+            if prefetch_streams:
+                records = self._prefetch_child_records(
+                    records,
+                    context,
+                    prefetch_streams,
                 )
 
-            row[name] = date_time.isoformat()
+            yield from records
+        finally:
+            for stream in parallel_streams:
+                stream.cancel_prefetch()
+
+    def _prefetch_child_records(
+        self,
+        records: t.Iterable[dict],
+        context: Context | None,
+        streams: list[IterableStream],
+    ):
+        # records are read ahead of being synced, so child stream records can be
+        # requested ahead too, for up to as many records as are requested concurrently
+        lookahead = max(s.max_parallel_requests for s in streams)
+        pending: deque[dict] = deque()
+
+        for record in records:
+            pending.append(record)
+
+            if child_context := self.get_child_context(record, context):
+                for stream in streams:
+                    stream.prefetch([child_context])
+
+            if len(pending) > lookahead:
+                yield pending.popleft()
+
+        yield from pending
+
+    def _post_process_records(self, records, context):
+        post_process = self.sync_stats.timed_post_process(
+            lambda record: self.post_process(record, context),
+        )
+
+        # as for the SDK, records post-processed to `None` are dropped
+        for record in map(post_process, records):
+            if record is not None:
+                yield record
+
+    @cached_property
+    def post_process_overridden(self) -> bool:
+        """Whether `post_process` is overridden, so must be called for each record."""
+        return type(self).post_process is not IterableStream.post_process
+
+    @cached_property
+    def max_parallel_requests(self) -> int:
+        """Maximum number of contexts to request records for concurrently."""
+        return self.config.get("max_parallel_requests") or 1
+
+    def prefetch(self, contexts: list[Context]):
+        """Request records for contexts ahead of them being synced.
+
+        Up to `max_parallel_requests` contexts are requested concurrently, in the order
+        given. Records are still emitted per context as each is synced. Contexts that
+        are not needed (see `needs_context`) are not requested.
+
+        Args:
+            contexts: Stream contexts, in the order they will be synced.
+        """
+        self._queued_contexts.extend(c for c in contexts if self.needs_context(c))
+        self._schedule_prefetch()
+
+    def prefetch_sync(self):
+        """Request records ahead of the stream being synced, as a top-level stream.
 
+        Records are requested in a thread, as for `prefetch`, unless the requests
+        depend on state only written once the stream is synced.
+        """
+        key = _context_key(None)
+
+        if key in self._prefetched:
+            return
+
+        if (prefetched := self._start_sync_prefetch()) is not None:
+            self._prefetched[key] = prefetched
+
+    def _start_sync_prefetch(self) -> t.Any:  # noqa: ANN401
+        if self.replication_key and self.filtered_by_bookmark:
+            return None
+
+        return self._start_prefetch(None)
+
+    def cancel_prefetch(self):
+        """Discard any records requested ahead of being synced.
+
+        Requests in progress are completed, but their records discarded.
+        """
+        self._queued_contexts.clear()
+
+        while self._prefetched:
+            _, prefetched = self._prefetched.popitem()
+            self._discard_prefetched(prefetched)
+
+    def close_prefetch(self):
+        """Discard any records requested ahead and stop the threads requesting them.
+
+        Requests not yet started are cancelled, without waiting for any in progress.
+        """
+        self.cancel_prefetch()
+
+        if executor := self.__dict__.pop("_executor", None):
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @cached_property
+    def _executor(self):
+        return ThreadPoolExecutor(
+            self.max_parallel_requests,
+            thread_name_prefix=self.name,
+        )
+
+    @cached_property
+    def _queued_contexts(self) -> deque[Context]:
+        return deque()
+
+    @cached_property
+    def _prefetched(self) -> dict[tuple, t.Any]:
+        return {}
+
+    def _schedule_prefetch(self):
+        while self._queued_contexts and (
+            len(self._prefetched) < self.max_parallel_requests
+        ):
+            context = self._queued_contexts.popleft()
+            self._prefetched[_context_key(context)] = self._start_prefetch(context)
+
+    def _pop_prefetched(self, context: Context | None) -> t.Any:  # noqa: ANN401
+        prefetched = self._prefetched.pop(_context_key(context), None)
+        self._schedule_prefetch()
+
+        return prefetched
+
+    def _start_prefetch(self, context: Context | None) -> t.Any:  # noqa: ANN401
+        return self._executor.submit(self._fetch_records, context)
+
+    def _fetch_records(self, context: Context | None) -> list[dict]:
+        return list(super().request_records(context))
+
+    def _read_prefetched(
+        self,
+        context: Context | None,  # noqa: ARG002
+        prefetched: t.Any,  # noqa: ANN401
+    ) -> t.Iterable[dict]:
+        return prefetched.result()
+
+    def _discard_prefetched(self, prefetched: t.Any):  # noqa: ANN401
+        prefetched.cancel()
+
+    @override
+    def request_records(self, context):
+        prefetched = self._pop_prefetched(context)
+
+        if prefetched is None:
+            if not self.parallel_contexts:
+                yield from super().request_records(context)
+                return
+
+            prefetched = self._start_prefetch(context)
+
+        yield from self._read_prefetched(context, prefetched)
+
+    @override
+    def post_process(self, row, context=None):
+        # records are already transformed by `record_transformer`, which subclasses
+        # can extend instead (see `build_record_transformer`)
         return row
+
+
+def _context_key(context: Context | None) -> tuple:
+    return tuple(context.items()) if context else ()
+
+
+# a schema file is the same for every instance of a stream class (and every tap in a
+# process), so properties derived from it are only worked out once per file (keyed by
+# its path as a string, since a `Traversable` need not be hashable)
+@cache
+def _load_schema(filepath: str) -> dict:
+    return json.loads(Path(filepath).read_text())
+
+
+@cache
+def _has_number_properties_in_file(filepath: str) -> bool:
+    return _has_number_properties(_load_schema(filepath))
+
+
+@cache
+def _get_date_time_properties_in_file(filepath: str) -> frozenset[str]:
+    return _get_date_time_properties(_load_schema(filepath))
+
+
+def _get_date_time_properties(schema: dict) -> frozenset[str]:
+    properties: dict[str, dict] = schema["properties"]
+
+    return frozenset(
+        name
+        for name, property_schema in properties.items()
+        if property_schema.get("format") == "date-time"
+    )
+
+
+def _has_number_properties(schema: dict) -> bool:
+    schema_type = schema.get("type", [])
+
+    if "number" in schema_type:
+        return True
+
+    subschemas = [
+        *schema.get("properties", {}).values(),
+        *filter(None, [schema.get("items")]),
+        *schema.get("anyOf", []),
+    ]
+
+    return any(_has_number_properties(s) for s in subschemas)
@@ -0,0 +1,255 @@
+"""Columnar decoding of export content into Apache Arrow tables."""
+
+from __future__ import annotations
+
+import importlib
+import json
+import time
+import typing as t
+
+if t.TYPE_CHECKING:
+    import pyarrow as pa  # type: ignore[import-not-found, import-untyped]
+
+    from tap_iterable import stats, transformers
+
+_JSON_TYPES = {
+    "string": "string",
+    "integer": "int64",
+    "number": "float64",
+    "boolean": "bool_",
+}
+
+
+def import_pyarrow(module: str = "pyarrow"):
+    """Import a `pyarrow` module, which is an optional dependency.
+
+    Args:
+        module: Name of the module.
+
+    Returns:
+        The module.
+
+    Raises:
+        ImportError: If `pyarrow` is not installed.
+    """
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        msg = "Install `tap-iterable[parquet]` to write `parquet` batch files"
+        raise ImportError(msg) from e
+
+
+def arrow_type(schema: dict) -> pa.DataType | None:
+    """Get the Arrow type of values described by a JSON schema.
+
+    Args:
+        schema: JSON schema.
+
+    Returns:
+        The Arrow type, or `None` if the schema does not describe a single type (so
+        the type should be inferred from values).
+    """
+    pa = import_pyarrow()
+
+    json_types = schema.get("type", [])
+
+    if isinstance(json_types, str):
+        json_types = [json_types]
+
+    json_types = [json_type for json_type in json_types if json_type != "null"]
+
+    if len(json_types) != 1:
+        return None
+
+    (json_type,) = json_types
+
+    if json_type == "object":
+        fields = arrow_fields(schema.get("properties", {}))
+        return pa.struct(fields) if fields else None
+
+    if json_type == "array":
+        item_type = arrow_type(schema.get("items") or {})
+        return pa.list_(item_type) if item_type else None
+
+    if type_name := _JSON_TYPES.get(json_type):
+        return getattr(pa, type_name)()
+
+    return None
+
+
+def arrow_fields(properties: dict[str, dict]) -> list[pa.Field]:
+    """Get Arrow fields for JSON schema properties, omitting any of unknown type.
+
+    Args:
+        properties: JSON schemas by property name.
+
+    Returns:
+        The Arrow fields.
+    """
+    pa = import_pyarrow()
+
+    return [
+        pa.field(name, value_type)
+        for name, schema in properties.items()
+        if (value_type := arrow_type(schema)) is not None
+    ]
+
+
+class TableReader:
+    """Decode JSON Lines content into Arrow tables, a block of records at a time.
+
+    Records are parsed by Arrow's multithreaded JSON reader, using types from the
+    stream schema where known and inferring them otherwise. JSON-encoded string
+    properties (e.g. `transactionalData`) are decoded as whole columns. Blocks that
+    cannot be decoded this way (e.g. as a value does not match its schema type) are
+    decoded record by record instead.
+    """
+
+    # bytes of content decoded per table
+    block_size = 16 * 1024**2
+
+    def __init__(
+        self,
+        properties: dict[str, dict],
+        *,
+        json_properties: t.Collection[str] = (),
+        transformer: transformers.Transformer,
+    ) -> None:
+        """Initialise the reader.
+
+        Args:
+            properties: JSON schemas by property name.
+            json_properties: Names of properties with JSON-encoded string values.
+            transformer: Record transformer equivalent to the columnar decoding, used
+                for blocks decoded record by record.
+        """
+        pa = import_pyarrow()
+        pj = import_pyarrow("pyarrow.json")
+
+        self.json_properties = [name for name in json_properties if name in properties]
+        self.transformer = transformer
+
+        # JSON-encoded values are read as strings, then decoded (see `_decode_json`)
+        self._parse_options = pj.ParseOptions(
+            explicit_schema=pa.schema(
+                arrow_fields(
+                    {
+                        **properties,
+                        **{name: {"type": "string"} for name in self.json_properties},
+                    }
+                )
+            ),
+            unexpected_field_behavior="infer",
+        )
+        self._json_parse_options = {
+            name: pj.ParseOptions(
+                explicit_schema=pa.schema(
+                    arrow_fields(properties[name].get("properties", {}))
+                ),
+                unexpected_field_behavior="infer",
+            )
+            for name in self.json_properties
+        }
+
+    def read(
+        self,
+        chunks: t.Iterable[bytes],
+        window_stats: stats.SyncStats,
+    ) -> t.Iterator[tuple[pa.Table, int]]:
+        """Decode content into tables of at least `block_size` bytes of records.
+
+        Args:
+            chunks: Content, in chunks of any size.
+            window_stats: Statistics to record decoding in.
+
+        Yields:
+            Each table, with the number of bytes of content decoded into it.
+        """
+        pending: list[bytes] = []
+        size = 0
+
+        for chunk in chunks:
+            pending.append(chunk)
+            size += len(chunk)
+
+            if size < self.block_size:
+                continue
+
+            content = b"".join(pending)
+
+            # end the block with the last complete record
+            end = content.rfind(b"\n") + 1
+            block = content[:end]
+
+            pending = [content[end:]]
+            size = len(pending[0])
+
+            if block:
+                yield self._read_block(block, window_stats), len(block)
+
+        if (block := b"".join(pending)).strip():
+            yield self._read_block(block, window_stats), len(block)
+
+    def _read_block(self, block: bytes, window_stats: stats.SyncStats) -> pa.Table:
+        pa = import_pyarrow()
+        pj = import_pyarrow("pyarrow.json")
+
+        start = time.perf_counter()
+
+        try:
+            table = pj.read_json(
+                pa.py_buffer(block),
+                parse_options=self._parse_options,
+            )
+
+            for name in self.json_properties:
+                if name in table.column_names:
+                    table = table.set_column(
+                        table.schema.get_field_index(name),
+                        name,
+                        self._decode_json(table[name], name),
+                    )
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            records = [
+                self.transformer(json.loads(line))
+                for line in block.splitlines()
+                if line.strip()
+            ]
+            table = pa.Table.from_pylist(records)
+
+        window_stats.add_decode(table.num_rows, time.perf_counter() - start)
+
+        return table
+
+    def _decode_json(self, column: pa.ChunkedArray, name: str) -> pa.Array:
+        pa = import_pyarrow()
+        pc = import_pyarrow("pyarrow.compute")
+        pj = import_pyarrow("pyarrow.json")
+
+        column = column.combine_chunks()
+
+        # null and empty values are not decoded
+        decode = pc.fill_null(pc.not_equal(column, ""), fill_value=False)
+        count = pc.sum(decode).as_py() or 0
+
+        parse_options = self._json_parse_options[name]
+
+        if not count:
+            return pa.nulls(len(column), pa.struct(parse_options.explicit_schema))
+
+        # decode all values at once, as a single JSON Lines document
+        values = pc.binary_join_element_wise(pc.filter(column, decode), "", "\n")
+        size = pc.sum(pc.binary_length(values)).as_py()
+        decoded = pj.read_json(
+            pa.py_buffer(values.buffers()[2][:size]),
+            parse_options=parse_options,
+        )
+
+        # map each row to its decoded value, or null if not decoded
+        indices = pc.if_else(
+            decode,
+            pc.subtract(pc.cumulative_sum(pc.cast(decode, pa.int64())), 1),
+            pa.scalar(None, pa.int64()),
+        )
+
+        return decoded.to_struct_array().combine_chunks().take(indices)
@@ -0,0 +1,54 @@
+"""JSON decoder backends."""
+
+from __future__ import annotations
+
+import decimal
+import functools
+import importlib
+import json
+import typing as t
+
+Decoder = t.Callable[[t.Union[str, bytes]], t.Any]
+
+BACKENDS = ("json", "msgspec", "orjson")
+
+
+def get_decoder(backend: str = "json", *, exact_numbers: bool = True) -> Decoder:
+    """Get a JSON decode function for the given backend.
+
+    The `json` (standard library) and `msgspec` backends decode floating-point numbers
+    as `decimal.Decimal` to preserve precision. `orjson` only supports decoding to
+    `float`, so the `json` backend is used instead if `exact_numbers` is requested.
+
+    Args:
+        backend: Name of the decoder backend (see `BACKENDS`).
+        exact_numbers: Whether floating-point numbers must be decoded without loss of
+            precision.
+
+    Returns:
+        A function that decodes a JSON document from `str` or `bytes`.
+
+    Raises:
+        ValueError: If the backend is not supported.
+    """
+    if backend not in BACKENDS:
+        msg = f"Unsupported JSON decoder backend: {backend}"
+        raise ValueError(msg)
+
+    if backend == "msgspec":
+        msgspec_json = _import_backend("msgspec", "msgspec.json")
+        return msgspec_json.Decoder(float_hook=decimal.Decimal).decode
+
+    if backend == "orjson" and not exact_numbers:
+        orjson = _import_backend("orjson", "orjson")
+        return orjson.loads
+
+    return functools.partial(json.loads, parse_float=decimal.Decimal)
+
+
+def _import_backend(name: str, module: str):
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        msg = f"Install `tap-iterable[{name}]` to use the `{name}` JSON decoder backend"
+        raise ImportError(msg) from e
@@ -0,0 +1,184 @@
+"""Deduplication of export records at replication key boundaries."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import typing as t
+
+from tap_iterable import columnar
+
+if t.TYPE_CHECKING:
+    import pyarrow as pa  # type: ignore[import-not-found, import-untyped]
+
+DIGEST_SIZE = 8
+
+
+class BoundaryKeys:
+    """Track primary keys of records at the latest replication key value seen.
+
+    Exports include records at both the start and end date, so records at a window
+    end (or bookmark) are exported again by the next window (or sync). Keys of records
+    at the latest value are kept, up to a maximum number, and persisted in state as
+    fixed-size digests; any record at the same value with a known key is a duplicate.
+
+    Replication key values are compared as strings, which order chronologically for
+    the date-time format of export records.
+    """
+
+    def __init__(
+        self,
+        primary_keys: t.Sequence[str],
+        replication_key: str,
+        *,
+        max_keys: int,
+    ) -> None:
+        """Initialise the tracker.
+
+        Args:
+            primary_keys: Properties that uniquely identify a record.
+            replication_key: Property of the value to track keys at.
+            max_keys: Maximum number of keys to track, after which duplicates of
+                further records at the same value are not detected.
+        """
+        self.primary_keys = tuple(primary_keys)
+        self.replication_key = replication_key
+        self.max_keys = max_keys
+        self.duplicate_count = 0
+
+        self.value: str | None = None
+        self._keys: set[tuple] = set()
+        self._digests: set[bytes] = set()  # from state, for the same value
+
+    def load(self, state: dict | None) -> None:
+        """Load keys persisted by `to_state`.
+
+        Args:
+            state: Persisted keys, if any.
+        """
+        if not state:
+            return
+
+        self.value = state["value"]
+        self._keys = set()
+
+        digests = base64.b64decode(state["keys"])
+        self._digests = {
+            digests[i : i + DIGEST_SIZE] for i in range(0, len(digests), DIGEST_SIZE)
+        }
+
+    def to_state(self) -> dict | None:
+        """Get keys to persist in state.
+
+        Returns:
+            The latest value and digests of the keys of records at it, or `None` if no
+            records were seen.
+        """
+        if self.value is None:
+            return None
+
+        digests = self._digests | {_digest(key) for key in self._keys}
+
+        return {
+            "value": self.value,
+            "keys": base64.b64encode(b"".join(sorted(digests))).decode(),
+        }
+
+    def is_duplicate(self, record: dict) -> bool:
+        """Check whether a record is a duplicate, tracking its key otherwise.
+
+        Args:
+            record: Record to check.
+
+        Returns:
+            Whether a record with the same key at the same value was already seen.
+        """
+        value = record.get(self.replication_key)
+
+        if value is None or (self.value is not None and value < self.value):
+            return False
+
+        key = tuple(record.get(k) for k in self.primary_keys)
+
+        if self.value is None or value > self.value:
+            self.value = value
+            self._keys = {key}
+            self._digests = set()
+            return False
+
+        if key in self._keys or (self._digests and _digest(key) in self._digests):
+            self.duplicate_count += 1
+            return True
+
+        if len(self._keys) + len(self._digests) < self.max_keys:
+            self._keys.add(key)
+
+        return False
+
+    def filter(self, records: t.Iterable[dict]) -> t.Iterator[dict]:
+        """Drop duplicate records.
+
+        Args:
+            records: Records to filter.
+
+        Yields:
+            Each record that is not a duplicate.
+        """
+        is_duplicate = self.is_duplicate
+
+        for record in records:
+            if not is_duplicate(record):
+                yield record
+
+    def filter_table(self, table: pa.Table) -> pa.Table:
+        """Drop duplicate records from a table.
+
+        Only records at the current or latest value are checked individually, as any
+        others cannot be duplicates and are superseded by the latest value.
+
+        Args:
+            table: Table of records to filter.
+
+        Returns:
+            The table without duplicate records.
+        """
+        pc = columnar.import_pyarrow("pyarrow.compute")
+
+        if self.replication_key not in table.column_names:
+            return table
+
+        values = table[self.replication_key]
+        latest = pc.max(values).as_py()
+
+        if latest is None or (self.value is not None and latest < self.value):
+            return table
+
+        is_candidate = pc.equal(values, latest)
+
+        if self.value is not None:
+            is_candidate = pc.or_(is_candidate, pc.equal(values, self.value))
+
+        candidates = pc.indices_nonzero(pc.fill_null(is_candidate, fill_value=False))
+        columns = [
+            name
+            for name in (self.replication_key, *self.primary_keys)
+            if name in table.column_names
+        ]
+        rows = table.take(candidates).select(columns).to_pylist()
+
+        mask = [True] * table.num_rows
+
+        # check in order of value, so keys at the current value are checked before
+        # being superseded by the latest
+        for index, record in sorted(
+            zip(candidates.to_pylist(), rows),
+            key=lambda item: item[1][self.replication_key],
+        ):
+            if self.is_duplicate(record):
+                mask[index] = False
+
+        return table if all(mask) else table.filter(mask)
+
+
+def _digest(key: tuple) -> bytes:
+    return hashlib.blake2b(repr(key).encode(), digest_size=DIGEST_SIZE).digest()
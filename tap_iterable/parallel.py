@@ -0,0 +1,207 @@
+"""Parallel decoding of export files in worker processes."""
+
+from __future__ import annotations
+
+import itertools
+import mmap
+import multiprocessing
+import time
+import typing as t
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from tap_iterable import decoders, spool
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+    from tap_iterable import stats, transformers
+
+# (path, start, end) of a chunk of an uncompressed file, or the chunk content
+Chunk = t.Union[tuple[str, int, int], tuple[bytes, int]]
+
+# decode function and record transformer of the worker process
+_decode: decoders.Decoder
+_transform: transformers.Transformer
+
+
+class DecodePool:
+    """Decode JSON Lines files into transformed records in worker processes.
+
+    Files are split into chunks of about `chunk_size` bytes at record boundaries, which
+    are decoded and transformed concurrently, then returned in their original order.
+    Uncompressed files are memory-mapped to find record boundaries and chunks are read
+    by the worker processes themselves, whereas compressed files are decompressed by
+    the calling process and chunk content is sent to the worker processes.
+
+    Worker processes are started on first use, and stopped by `close`.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int,
+        chunk_size: int,
+        decoder_backend: str,
+        exact_numbers: bool,
+        transformer: transformers.Transformer,
+    ) -> None:
+        """Initialise the pool.
+
+        Args:
+            workers: Number of worker processes.
+            chunk_size: Number of bytes of records to decode per chunk.
+            decoder_backend: JSON decoder backend (see `decoders.get_decoder`).
+            exact_numbers: Whether floating-point numbers must be decoded without loss
+                of precision.
+            transformer: Record transformer, which must be picklable.
+        """
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._initargs = (decoder_backend, exact_numbers, transformer)
+        self._executor: ProcessPoolExecutor | None = None
+
+    def close(self) -> None:
+        """Stop the worker processes, if started."""
+        if self._executor:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def read(
+        self,
+        filepath: Path,
+        window_stats: stats.SyncStats,
+        offset: int = 0,
+    ) -> t.Iterator[tuple[list[dict], list[int]]]:
+        """Decode and transform the records in a file.
+
+        Args:
+            filepath: Path of the file, which may be compressed (see `spool`).
+            window_stats: Statistics to record decoding and post-processing in.
+            offset: Uncompressed byte offset to start reading from.
+
+        Yields:
+            The records in each chunk, with the uncompressed byte offset of the end of
+            each record.
+        """
+        if not self._executor:
+            # workers are spawned rather than forked, as forking while other threads
+            # (e.g. downloads) hold locks can deadlock the worker processes
+            self._executor = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=self._initargs,
+            )
+
+        pending: deque[Future] = deque()
+
+        try:
+            for chunk in self._split(filepath, offset):
+                pending.append(self._executor.submit(_decode_chunk, chunk))
+
+                # keep every worker busy, without reading far ahead of the consumer
+                if len(pending) > 2 * self.workers:
+                    yield self._result(pending.popleft(), window_stats)
+
+            while pending:
+                yield self._result(pending.popleft(), window_stats)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _split(self, filepath: Path, offset: int) -> t.Iterator[Chunk]:
+        if spool.detect_compression(filepath) != "none":
+            yield from self._split_content(filepath, offset)
+            return
+
+        size = filepath.stat().st_size
+        start = offset
+
+        if start >= size:
+            return
+
+        path = str(filepath.resolve())
+
+        with filepath.open("rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        with mm:
+            while start < size:
+                # end each chunk with the first complete record past `chunk_size`
+                end = mm.find(b"\n", min(start + self.chunk_size, size) - 1) + 1
+                end = end or size
+                yield path, start, end
+                start = end
+
+    def _split_content(self, filepath: Path, offset: int) -> t.Iterator[Chunk]:
+        with spool.open_reader(filepath) as f:
+            spool.skip(f, offset)
+            pending = b""
+
+            while chunk := f.read(self.chunk_size):
+                content = pending + chunk
+                end = content.rfind(b"\n") + 1
+
+                if end:
+                    yield content[:end], offset
+                    offset += end
+
+                pending = content[end:]
+
+            if pending:
+                yield pending, offset
+
+    def _result(
+        self,
+        future: Future,
+        window_stats: stats.SyncStats,
+    ) -> tuple[list[dict], list[int]]:
+        records, ends, decode_duration, post_process_duration = future.result()
+
+        window_stats.add_decode(len(records), decode_duration)
+        window_stats.add_post_process(post_process_duration)
+
+        return records, ends
+
+
+def _init_worker(
+    decoder_backend: str,
+    exact_numbers: bool,  # noqa: FBT001
+    transformer: transformers.Transformer,
+) -> None:
+    global _decode, _transform  # noqa: PLW0603
+
+    _decode = decoders.get_decoder(decoder_backend, exact_numbers=exact_numbers)
+    _transform = transformer
+
+
+def _decode_chunk(chunk: Chunk) -> tuple[list[dict], list[int], float, float]:
+    if len(chunk) == 3:  # noqa: PLR2004 - a chunk of an uncompressed file
+        path, start, end = chunk
+
+        with open(path, "rb") as f:  # noqa: PTH123
+            f.seek(start)
+            content = f.read(end - start)
+    else:
+        content, start = chunk
+
+    lines = content.split(b"\n")
+
+    # offset of the end of each record, including its newline (if any)
+    size = len(content)
+    ends = [
+        start + min(end, size)
+        for line, end in zip(lines, itertools.accumulate(len(x) + 1 for x in lines))
+        if line
+    ]
+
+    start_time = time.perf_counter()
+    records = [_decode(line) for line in lines if line]
+    decode_duration = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    records = [_transform(record) for record in records]
+    post_process_duration = time.perf_counter() - start_time
+
+    return records, ends, decode_duration, post_process_duration
@@ -0,0 +1,93 @@
+"""Planning of the requests needed to sync the selected streams."""
+
+from __future__ import annotations
+
+import typing as t
+
+from tap_iterable.client import IterableStream
+
+if t.TYPE_CHECKING:
+    from singer_sdk import Stream
+
+
+class RequestEstimate:
+    """Estimated minimum number of requests to sync a stream."""
+
+    def __init__(self, requests: int, *, per_record_of: str | None = None) -> None:
+        """Initialise the estimate.
+
+        Args:
+            requests: Number of requests, excluding pagination and retries.
+            per_record_of: Name of the parent stream, if requests are made for each
+                of its records.
+        """
+        self.requests = requests
+        self.per_record_of = per_record_of
+
+    def __str__(self) -> str:  # noqa: D105
+        description = f"{self.requests} request{'s' * (self.requests != 1)}"
+
+        if self.per_record_of:
+            description += f" per record of '{self.per_record_of}'"
+
+        return description
+
+
+def plan_requests(streams: t.Iterable[Stream]) -> dict[str, RequestEstimate]:
+    """Estimate the requests needed to sync streams, given their selection.
+
+    Streams that are not synced (i.e. neither selected nor with a selected descendant)
+    are omitted, as are streams that make no requests (e.g. that only generate
+    contexts). Requests for child streams are estimated per record of their parent
+    stream, unless the parent generates contexts without making requests, in which
+    case only contexts that are needed are counted (see
+    `IterableStream.needs_context`).
+
+    Args:
+        streams: Streams of the tap.
+
+    Returns:
+        Estimated requests by stream name, in the order given.
+    """
+    streams = list(streams)
+    streams_by_type = {type(s): s for s in streams}
+    estimates = {}
+
+    for stream in streams:
+        if not isinstance(stream, IterableStream):
+            continue
+
+        if not (stream.selected or stream.has_selected_descendents):
+            continue
+
+        parent = (
+            streams_by_type.get(stream.parent_stream_type)
+            if stream.parent_stream_type
+            else None
+        )
+
+        if not parent:
+            estimates[stream.name] = RequestEstimate(stream.estimate_requests(None))
+        elif isinstance(parent, IterableStream):
+            estimates[stream.name] = RequestEstimate(
+                stream.estimate_requests(None),
+                per_record_of=parent.name,
+            )
+        else:
+            contexts = [
+                context
+                for record in parent.get_records(None)
+                # context-only parent streams (e.g. message mediums) yield plain records
+                if isinstance(record, dict)
+                for context in parent.generate_child_contexts(record, None)
+                if context is not None
+            ]
+            estimates[stream.name] = RequestEstimate(
+                sum(
+                    stream.estimate_requests(context)
+                    for context in contexts
+                    if stream.needs_context(context)
+                )
+            )
+
+    return estimates
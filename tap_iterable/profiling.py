@@ -0,0 +1,99 @@
+"""CPU and memory profiling of stream syncs."""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import tracemalloc
+import typing as t
+from contextlib import contextmanager
+
+if t.TYPE_CHECKING:
+    import logging
+    from pathlib import Path
+
+
+@contextmanager
+def profile(
+    name: str,
+    output_dir: Path,
+    *,
+    logger: logging.Logger,
+    top: int = 20,
+) -> t.Iterator[None]:
+    """Profile CPU time and memory allocations of the calling thread.
+
+    Writes a `cProfile` dump (`<name>.prof`, e.g. for `python -m pstats`) and a
+    `tracemalloc` snapshot (`<name>.tracemalloc`, see `tracemalloc.Snapshot.load`) to
+    `output_dir`, then logs the functions most time was spent in and the allocation
+    sites of memory retained since profiling started.
+
+    Only the calling thread is profiled (e.g. not download threads or worker
+    processes), whereas memory allocations are traced across all threads.
+
+    Args:
+        name: Name of the profile (e.g. stream name).
+        output_dir: Directory to write profile files to.
+        logger: Logger to log the profile summary to.
+        top: Number of functions and allocation sites to log.
+
+    Yields:
+        Nothing, profiling until the context exits.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # tracing is left running if already started (e.g. by `PYTHONTRACEMALLOC`)
+    started_tracing = not tracemalloc.is_tracing()
+
+    if started_tracing:
+        tracemalloc.start()
+
+    start_snapshot = _take_snapshot()
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    try:
+        yield
+    finally:
+        profiler.disable()
+
+        snapshot = _take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+
+        if started_tracing:
+            tracemalloc.stop()
+
+        snapshot.dump(str(output_dir / f"{name}.tracemalloc"))
+        retained = snapshot.compare_to(start_snapshot, "lineno")[:top]
+
+        logger.info(
+            "Peak traced memory while profiling '%s': %.1f MB. Top %d allocation "
+            "sites by memory retained:\n%s",
+            name,
+            peak / 1024**2,
+            top,
+            "\n".join(map(str, retained)),
+        )
+
+        filepath = output_dir / f"{name}.prof"
+        profiler.dump_stats(filepath)
+
+        summary = io.StringIO()
+        stats = pstats.Stats(profiler, stream=summary)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(top)
+
+        logger.info(
+            "Profile of '%s' written to %s. Top %d functions by own time:\n%s",
+            name,
+            filepath,
+            top,
+            summary.getvalue().strip(),
+        )
+
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    # exclude memory allocated by tracemalloc itself
+    return tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__),),
+    )
@@ -0,0 +1,153 @@
+"""Endpoint rate limiting, shared by all streams of a tap."""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+import typing as t
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+if t.TYPE_CHECKING:
+    import requests
+
+
+class TokenBucket:
+    """Thread-safe token bucket that schedules callers to stay under a rate limit.
+
+    Callers reserve the next available slot and sleep until it, so concurrent callers
+    are spaced evenly rather than all retrying at once. The rate is halved when the
+    API reports the limit was exceeded, and recovers gradually on success. Once
+    closed, callers no longer wait.
+    """
+
+    def __init__(self, rate: float, *, capacity: int = 1) -> None:
+        """Initialise the bucket.
+
+        Args:
+            rate: Maximum requests per second.
+            capacity: Maximum number of requests allowed in a burst.
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+
+        self._lock = threading.Lock()
+        self._next = time.monotonic()  # time the bucket is next empty
+        self._closed = threading.Event()
+
+    def acquire(self) -> float:
+        """Wait until a request is allowed, or the bucket is closed.
+
+        Returns:
+            The number of seconds reserved to wait.
+        """
+        with self._lock:
+            now = time.monotonic()
+            interval = 1 / self.rate
+
+            start = max(self._next, now)
+            delay = max(start - (self.capacity - 1) * interval - now, 0)
+            self._next = start + interval
+
+        self._closed.wait(delay)
+        return delay
+
+    def close(self) -> None:
+        """Stop callers waiting, e.g. as no more requests are to be sent."""
+        self._closed.set()
+
+    def throttle(self, delay: float | None = None) -> None:
+        """Slow down after the rate limit was exceeded.
+
+        Args:
+            delay: Seconds to wait before allowing another request, if known (e.g.
+                from a `Retry-After` header).
+        """
+        with self._lock:
+            self.rate = self.rate / 2
+            interval = 1 / self.rate
+
+            if delay is None:
+                delay = interval
+
+            next_allowed = time.monotonic() + delay + (self.capacity - 1) * interval
+            self._next = max(self._next, next_allowed)
+
+    def recover(self) -> None:
+        """Step the rate back up towards the limit after a successful request."""
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.rate + self.max_rate / 10, self.max_rate)
+
+
+class RateLimiter:
+    """Token buckets for API paths."""
+
+    def __init__(self, limits: t.Mapping[str, float]) -> None:
+        """Initialise the rate limiter.
+
+        Args:
+            limits: Requests per minute by API path. Path segments in braces (e.g.
+                `{table}`) match any value. Paths with a limit of `0` are not limited.
+        """
+        self._buckets = [
+            (_path_pattern(path), TokenBucket(rate / 60))
+            for path, rate in limits.items()
+            if rate
+        ]
+
+    def close(self) -> None:
+        """Stop callers waiting for any bucket."""
+        for _, bucket in self._buckets:
+            bucket.close()
+
+    def get(self, path: str) -> TokenBucket | None:
+        """Get the token bucket for a path.
+
+        Args:
+            path: API path, without query string.
+
+        Returns:
+            The token bucket, or `None` if the path is not limited.
+        """
+        for pattern, bucket in self._buckets:
+            if pattern.fullmatch(path):
+                return bucket
+
+        return None
+
+
+def retry_after(response: requests.Response) -> float | None:
+    """Get the number of seconds to wait before retrying from a response.
+
+    Args:
+        response: HTTP response.
+
+    Returns:
+        Seconds from the `Retry-After` header, or `None` if not present or invalid.
+    """
+    value = response.headers.get("Retry-After")
+
+    if not value:
+        return None
+
+    if value.isdigit():
+        return float(value)
+
+    try:
+        date_time = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max((date_time - datetime.now(tz=timezone.utc)).total_seconds(), 0)
+
+
+def _path_pattern(path: str) -> re.Pattern:
+    segments = (
+        "[^/]+" if re.fullmatch(r"\{\w+\}", s) else re.escape(s)
+        for s in path.split("/")
+    )
+
+    return re.compile("/".join(segments))
@@ -0,0 +1,202 @@
+"""Resumption of export downloads interrupted by connection errors."""
+
+from __future__ import annotations
+
+import typing as t
+
+import requests
+
+from tap_iterable import columnar
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+    import pyarrow as pa  # type: ignore[import-not-found, import-untyped]
+
+# errors raised while reading response content when the connection is reset
+CONNECTION_ERRORS = (
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ConnectionError,
+)
+
+
+class IncompleteDownloadError(Exception):
+    """Download failed part way, after complete records were written to a file."""
+
+    def __init__(self, filepath: Path, error: Exception) -> None:
+        """Initialise the error.
+
+        Args:
+            filepath: Path of the file complete records were written to.
+            error: The connection error.
+        """
+        super().__init__(f"Download incomplete: {filepath} ({error})")
+        self.filepath = filepath
+        self.error = error
+
+
+class ExportProgress:
+    """Track the latest replication key value of export records emitted.
+
+    An interrupted export can be requested again from the latest value only if every
+    record before it was emitted, so records must also be in order of replication key
+    value. Values are compared as strings (see `dedupe.BoundaryKeys`).
+
+    The export requested again includes records at the latest value that were
+    already emitted, so the primary keys of those records are kept (up to a maximum
+    number, as for `dedupe.BoundaryKeys`) to skip them once resumed (see `resume`).
+    Beyond the maximum, records at the latest value are emitted again.
+    """
+
+    def __init__(
+        self,
+        replication_key: str,
+        primary_keys: t.Sequence[str] = (),
+        *,
+        max_keys: int = 10000,
+    ) -> None:
+        """Initialise the tracker.
+
+        Args:
+            replication_key: Property of the value to track.
+            primary_keys: Properties that uniquely identify a record.
+            max_keys: Maximum number of keys to keep, after which no records at the
+                latest value are skipped once resumed.
+        """
+        self.replication_key = replication_key
+        self.primary_keys = tuple(primary_keys)
+        self.max_keys = max_keys
+        self.value: str | None = None
+        self.ordered = True
+
+        # of records emitted at the latest value, unless there are more than
+        # `max_keys`
+        self._keys: set[tuple] = set()
+        self._keys_complete = True
+        self._resumed = False
+
+    @property
+    def keys_complete(self) -> bool:
+        """Whether the keys of all records emitted at the latest value are kept."""
+        return self._keys_complete
+
+    def resume(self) -> None:
+        """Skip records already emitted at the latest value from now on."""
+        self._resumed = True
+
+    def track(self, records: t.Iterable[dict]) -> t.Iterator[dict]:
+        """Track records as they are emitted.
+
+        Args:
+            records: Records to track.
+
+        Yields:
+            Each record, except any skipped as already emitted.
+        """
+        replication_key = self.replication_key
+        primary_keys = self.primary_keys
+
+        for record in records:
+            value = record.get(replication_key)
+
+            if value is not None:
+                if self.value is not None and value < self.value:
+                    self.ordered = False
+                else:
+                    key = tuple(record.get(k) for k in primary_keys)
+
+                    if value != self.value:
+                        self._set_value(value)
+                    elif self._resumed and key in self._keys:
+                        continue
+
+                    self._add_keys([key])
+
+            yield record
+
+    def track_tables(self, tables: t.Iterable[pa.Table]) -> t.Iterator[pa.Table]:
+        """Track tables of records as they are emitted.
+
+        Args:
+            tables: Tables of records to track.
+
+        Yields:
+            Each table, without any records skipped as already emitted.
+        """
+        pc = columnar.import_pyarrow("pyarrow.compute")
+
+        for table in tables:
+            if self.replication_key in table.column_names:
+                if self._resumed and self._keys:
+                    table = self._skip_table_records(table)  # noqa: PLW2901
+
+                values = table[self.replication_key].drop_null()
+
+                if len(values):
+                    first = values[0].as_py()
+                    latest = pc.max(values).as_py()
+                    ordered = pc.all(
+                        pc.greater_equal(values[1:], values[:-1]),
+                        min_count=0,  # tables of a single record are ordered
+                    ).as_py()
+
+                    if not ordered or (self.value is not None and first < self.value):
+                        self.ordered = False
+
+                    if self.value is None or latest > self.value:
+                        self._set_value(latest)
+
+                    if latest == self.value:
+                        self._add_keys(self._table_keys(table, latest))
+
+            yield table
+
+    def _set_value(self, value: str) -> None:
+        self.value = value
+        self._keys = set()
+        self._keys_complete = True
+        self._resumed = False
+
+    def _add_keys(self, keys: t.Iterable[tuple]) -> None:
+        if not self._keys_complete:
+            return
+
+        self._keys.update(keys)
+
+        # records emitted again are preferable to unbounded memory use
+        if len(self._keys) > self.max_keys:
+            self._keys = set()
+            self._keys_complete = False
+
+    def _skip_table_records(self, table: pa.Table) -> pa.Table:
+        pc = columnar.import_pyarrow("pyarrow.compute")
+
+        is_candidate = pc.fill_null(
+            pc.equal(table[self.replication_key], self.value),
+            fill_value=False,
+        )
+
+        if not pc.any(is_candidate).as_py():
+            return table
+
+        candidates = pc.indices_nonzero(is_candidate).to_pylist()
+        keys = self._table_keys(table.take(candidates))
+
+        mask = [True] * table.num_rows
+
+        for index, key in zip(candidates, keys):
+            if key in self._keys:
+                mask[index] = False
+
+        return table if all(mask) else table.filter(mask)
+
+    def _table_keys(self, table: pa.Table, value: str | None = None) -> list[tuple]:
+        pc = columnar.import_pyarrow("pyarrow.compute")
+
+        if value is not None:
+            table = table.filter(pc.equal(table[self.replication_key], value))
+
+        columns = [k for k in self.primary_keys if k in table.column_names]
+        rows = table.select(columns).to_pylist()
+
+        return [tuple(row.get(k) for k in self.primary_keys) for row in rows]
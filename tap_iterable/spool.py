@@ -0,0 +1,111 @@
+"""Compressed spool files for downloaded exports."""
+
+from __future__ import annotations
+
+import gzip
+import io
+import typing as t
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def open_writer(filepath: Path, compression: str = "none") -> io.BufferedIOBase:
+    """Open a spool file for writing.
+
+    Args:
+        filepath: Path of the spool file.
+        compression: Compression format (see `COMPRESSIONS`).
+
+    Returns:
+        A binary file object that compresses content written to it.
+
+    Raises:
+        ValueError: If the compression format is not supported.
+    """
+    if compression not in COMPRESSIONS:
+        msg = f"Unsupported spool compression: {compression}"
+        raise ValueError(msg)
+
+    if compression == "gzip":
+        # favour speed over size, as spool files are short-lived
+        return gzip.open(filepath, "wb", compresslevel=1)
+
+    if compression == "zstd":
+        zstandard = _import_zstandard()
+        return zstandard.open(filepath, "wb")
+
+    return filepath.open("wb")
+
+
+def open_reader(filepath: Path) -> io.BufferedIOBase:
+    """Open a spool file for reading, detecting any compression from its content.
+
+    Args:
+        filepath: Path of the spool file.
+
+    Returns:
+        A binary file object that decompresses content read from it.
+    """
+    compression = detect_compression(filepath)
+
+    if compression == "gzip":
+        return gzip.open(filepath, "rb")
+
+    if compression == "zstd":
+        zstandard = _import_zstandard()
+        return io.BufferedReader(zstandard.open(filepath, "rb"))
+
+    return filepath.open("rb")
+
+
+def detect_compression(filepath: Path) -> str:
+    """Detect the compression format of a spool file from its content.
+
+    Args:
+        filepath: Path of the spool file.
+
+    Returns:
+        The compression format (see `COMPRESSIONS`).
+    """
+    with filepath.open("rb") as f:
+        magic = f.read(4)
+
+    if magic.startswith(GZIP_MAGIC):
+        return "gzip"
+
+    if magic.startswith(ZSTD_MAGIC):
+        return "zstd"
+
+    return "none"
+
+
+def skip(f: io.BufferedIOBase, offset: int, chunk_size: int = 1024**2) -> None:
+    """Advance a file opened with `open_reader` to an uncompressed byte offset.
+
+    Args:
+        f: Binary file object.
+        offset: Byte offset to advance to.
+        chunk_size: Number of bytes to read at a time, if the file is not seekable.
+    """
+    if f.seekable():
+        f.seek(offset)
+        return
+
+    while offset > 0 and (chunk := f.read(min(chunk_size, offset))):
+        offset -= len(chunk)
+
+
+def _import_zstandard() -> t.Any:  # noqa: ANN401 - untyped optional dependency
+    try:
+        import zstandard  # type: ignore[import-not-found, import-untyped]
+    except ImportError as e:
+        msg = "Install `tap-iterable[zstd]` to use `zstd` spool compression"
+        raise ImportError(msg) from e
+
+    return zstandard
@@ -0,0 +1,319 @@
+"""Sync performance statistics, logged as Singer metrics."""
+
+from __future__ import annotations
+
+import enum
+import json
+import tempfile
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+from singer_sdk import metrics
+
+if t.TYPE_CHECKING:
+    import os
+
+    import requests
+
+_T = t.TypeVar("_T")
+_R = t.TypeVar("_R")
+
+
+class Metric(str, enum.Enum):
+    """Sync performance metric names."""
+
+    BYTES_DOWNLOADED = "http_bytes_downloaded"
+    DOWNLOAD_DURATION = "http_download_duration"
+    DOWNLOAD_RATE = "http_download_rate"
+    TIME_TO_FIRST_BYTE = "http_time_to_first_byte"
+    WAIT_DURATION = "http_wait_duration"
+    RETRY_COUNT = "http_retry_count"
+    RECORDS_DECODED = "records_decoded"
+    DECODE_DURATION = "decode_duration"
+    DECODE_RATE = "decode_rate"
+    POST_PROCESS_DURATION = "post_process_duration"
+    EMIT_DURATION = "emit_duration"
+    PEAK_SPOOL_SIZE = "peak_spool_size"
+    SPOOL_WRITE_DURATION = "spool_write_duration"
+
+
+# metric type and description, in Prometheus exposition order
+METRICS = {
+    Metric.BYTES_DOWNLOADED: ("counter", "Bytes of response content downloaded"),
+    Metric.DOWNLOAD_DURATION: ("timer", "Seconds spent downloading responses"),
+    Metric.DOWNLOAD_RATE: ("gauge", "Download rate in MB per second"),
+    Metric.TIME_TO_FIRST_BYTE: ("timer", "Slowest time to first byte in seconds"),
+    Metric.WAIT_DURATION: ("timer", "Seconds spent waiting for response headers"),
+    Metric.RETRY_COUNT: ("counter", "Requests retried"),
+    Metric.RECORDS_DECODED: ("counter", "Records decoded from responses"),
+    Metric.DECODE_DURATION: ("timer", "Seconds spent decoding records"),
+    Metric.DECODE_RATE: ("gauge", "Records decoded per second"),
+    Metric.POST_PROCESS_DURATION: ("timer", "Seconds spent post-processing records"),
+    Metric.EMIT_DURATION: ("timer", "Seconds spent validating and writing records"),
+    Metric.PEAK_SPOOL_SIZE: ("gauge", "Largest spooled response size in bytes"),
+    Metric.SPOOL_WRITE_DURATION: ("timer", "Seconds spent writing responses to disk"),
+}
+
+
+class SyncStats:
+    """Thread-safe performance statistics for a stream or export window.
+
+    Durations and sizes are accumulated as records are downloaded and processed, and
+    logged as Singer METRIC log lines by `log`.
+    """
+
+    def __init__(self) -> None:
+        """Initialise the statistics."""
+        self.bytes_downloaded = 0
+        self.download_duration = 0.0
+        self.time_to_first_byte = 0.0
+        self.wait_duration = 0.0
+        self.retry_count = 0
+        self.records_decoded = 0
+        self.decode_duration = 0.0
+        self.post_process_duration = 0.0
+        self.emit_duration = 0.0
+        self.peak_spool_size = 0
+        self.spool_write_duration = 0.0
+
+        self._lock = threading.Lock()
+
+    def add_response(self, response: requests.Response) -> None:
+        """Record the time to first byte of a response.
+
+        Args:
+            response: HTTP response.
+        """
+        elapsed = response.elapsed.total_seconds()
+
+        with self._lock:
+            self.time_to_first_byte = max(self.time_to_first_byte, elapsed)
+            self.wait_duration += elapsed
+
+    def add_download(self, size: int, duration: float) -> None:
+        """Record downloaded response content.
+
+        Args:
+            size: Number of bytes downloaded.
+            duration: Seconds spent downloading.
+        """
+        with self._lock:
+            self.bytes_downloaded += size
+            self.download_duration += duration
+
+    def add_spool(self, size: int, duration: float = 0.0) -> None:
+        """Record the size of a response written to disk.
+
+        Args:
+            size: Number of bytes written.
+            duration: Seconds spent writing, if measured separately from downloading.
+        """
+        with self._lock:
+            self.peak_spool_size = max(self.peak_spool_size, size)
+            self.spool_write_duration += duration
+
+    def add_decode(self, count: int, duration: float) -> None:
+        """Record records decoded together (e.g. into a table).
+
+        Args:
+            count: Number of records decoded.
+            duration: Seconds spent decoding.
+        """
+        with self._lock:
+            self.records_decoded += count
+            self.decode_duration += duration
+
+    def add_post_process(self, duration: float) -> None:
+        """Record records post-processed together (e.g. in a worker process).
+
+        Args:
+            duration: Seconds spent post-processing.
+        """
+        with self._lock:
+            self.post_process_duration += duration
+
+    def add_emit(self, duration: float) -> None:
+        """Record a record validated and written as Singer messages.
+
+        Args:
+            duration: Seconds spent validating and writing.
+        """
+        with self._lock:
+            self.emit_duration += duration
+
+    def add_retry(self) -> None:
+        """Record a retried request."""
+        with self._lock:
+            self.retry_count += 1
+
+    def merge(self, other: SyncStats) -> None:
+        """Add statistics from another instance (e.g. of an export window).
+
+        Args:
+            other: Statistics to add.
+        """
+        with self._lock:
+            self.bytes_downloaded += other.bytes_downloaded
+            self.download_duration += other.download_duration
+            self.time_to_first_byte = max(
+                self.time_to_first_byte,
+                other.time_to_first_byte,
+            )
+            self.wait_duration += other.wait_duration
+            self.retry_count += other.retry_count
+            self.records_decoded += other.records_decoded
+            self.decode_duration += other.decode_duration
+            self.post_process_duration += other.post_process_duration
+            self.emit_duration += other.emit_duration
+            self.peak_spool_size = max(self.peak_spool_size, other.peak_spool_size)
+            self.spool_write_duration += other.spool_write_duration
+
+    def timed_decode(self, decode: t.Callable[[_T], _R]) -> t.Callable[[_T], _R]:
+        """Wrap a decode function to record time spent decoding each record.
+
+        Not thread-safe, so must only be called from the thread consuming records.
+
+        Args:
+            decode: Function that decodes a single record.
+
+        Returns:
+            The wrapped function.
+        """
+        perf_counter = time.perf_counter
+
+        def timed(value: _T) -> _R:
+            start = perf_counter()
+            record = decode(value)
+            self.decode_duration += perf_counter() - start
+            self.records_decoded += 1
+
+            return record
+
+        return timed
+
+    def timed_post_process(self, func: t.Callable[[_T], _R]) -> t.Callable[[_T], _R]:
+        """Wrap a post-process function to record time spent processing each record.
+
+        Not thread-safe, so must only be called from the thread consuming records.
+
+        Args:
+            func: Function that post-processes a single record.
+
+        Returns:
+            The wrapped function.
+        """
+        perf_counter = time.perf_counter
+
+        def timed(value: _T) -> _R:
+            start = perf_counter()
+            record = func(value)
+            self.post_process_duration += perf_counter() - start
+
+            return record
+
+        return timed
+
+    def values(self) -> dict[Metric, float]:
+        """Get the value of each metric.
+
+        Rates are omitted if no time was spent on the corresponding work.
+
+        Returns:
+            Metric values by metric name.
+        """
+        values = {
+            Metric.BYTES_DOWNLOADED: self.bytes_downloaded,
+            Metric.DOWNLOAD_DURATION: round(self.download_duration, 6),
+            Metric.TIME_TO_FIRST_BYTE: round(self.time_to_first_byte, 6),
+            Metric.WAIT_DURATION: round(self.wait_duration, 6),
+            Metric.RETRY_COUNT: self.retry_count,
+            Metric.RECORDS_DECODED: self.records_decoded,
+            Metric.DECODE_DURATION: round(self.decode_duration, 6),
+            Metric.POST_PROCESS_DURATION: round(self.post_process_duration, 6),
+            Metric.EMIT_DURATION: round(self.emit_duration, 6),
+            Metric.PEAK_SPOOL_SIZE: self.peak_spool_size,
+            Metric.SPOOL_WRITE_DURATION: round(self.spool_write_duration, 6),
+        }
+
+        if self.download_duration:
+            mb_per_second = self.bytes_downloaded / 1000**2 / self.download_duration
+            values[Metric.DOWNLOAD_RATE] = round(mb_per_second, 3)
+
+        if self.decode_duration:
+            records_per_second = self.records_decoded / self.decode_duration
+            values[Metric.DECODE_RATE] = round(records_per_second, 1)
+
+        return values
+
+    def log(
+        self,
+        tags: dict[str, t.Any],
+        *,
+        exclude: t.Collection[Metric] = (),
+    ) -> None:
+        """Log each metric as a Singer METRIC log line.
+
+        Args:
+            tags: Tags to add to each metric (e.g. stream name).
+            exclude: Metrics not to log (e.g. those not recorded).
+        """
+        logger = metrics.get_metrics_logger()
+
+        for metric, value in self.values().items():
+            if metric in exclude:
+                continue
+
+            metric_type, _ = METRICS[metric]
+
+            # in the format of `metrics.Point`, which only accepts SDK metric names
+            point = {
+                "type": metric_type,
+                "metric": metric.value,
+                "value": value,
+                "tags": tags,
+            }
+            logger.info("METRIC: %s", json.dumps(point, default=str))
+
+
+def write_prometheus_textfile(
+    filepath: str | os.PathLike,
+    stats: t.Mapping[str, SyncStats],
+    *,
+    prefix: str = "tap_iterable",
+) -> None:
+    """Write statistics to a Prometheus textfile collector file.
+
+    The file is replaced atomically, so is never read partially written.
+
+    Args:
+        filepath: Path of the file to write.
+        stats: Statistics by stream name.
+        prefix: Prefix for metric names.
+    """
+    values = {name: s.values() for name, s in stats.items()}
+    lines = []
+
+    for metric, (_, description) in METRICS.items():
+        name = f"{prefix}_{metric.value}"
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} gauge")
+
+        lines.extend(
+            f'{name}{{stream="{stream}"}} {stream_values[metric]}'
+            for stream, stream_values in values.items()
+            if metric in stream_values
+        )
+
+    path = Path(filepath)
+
+    with tempfile.NamedTemporaryFile(
+        "w",
+        dir=path.parent,
+        prefix=f".{path.name}-",
+        delete=False,
+    ) as f:
+        f.write("\n".join(lines) + "\n")
+
+    Path(f.name).replace(path)
@@ -2,11 +2,25 @@
 
 from __future__ import annotations
 
-from singer_sdk import Tap
+import typing as t
+from functools import cached_property
+
+from singer_sdk import Tap, metrics
 from singer_sdk import typing as th  # JSON schema typing helpers
 from typing_extensions import override
 
-from tap_iterable import streams
+from tap_iterable import (
+    decoders,
+    planner,
+    ratelimit,
+    spool,
+    stats,
+    streams,
+    transport,
+)
+
+if t.TYPE_CHECKING:
+    from singer_sdk.streams import Stream
 
 
 class TapIterable(Tap):
@@ -26,7 +40,7 @@ class TapIterable(Tap):
         th.Property(
             "region",
             th.StringType,
-            allowed_values=("US", "EU"),
+            allowed_values=["US", "EU"],
             default="US",
             title="Region",
             description="Iterable region",
@@ -41,42 +55,529 @@ class TapIterable(Tap):
             th.DateTimeType,
             description="Timestamp in ISO 8601 format to get data up to (inclusive)",
         ),
+        th.Property(
+            "export_window_hours",
+            th.IntegerType,
+            title="Export window (hours)",
+            description=(
+                "Maximum date range in hours to request per export, with state "
+                "emitted after each completed window (e.g. `24` for daily windows). "
+                "Without a `start_date` or existing bookmark, windows start from the "
+                "earliest window with any records, found by first requesting exports "
+                "of successively halved date ranges since 2013. Without an "
+                "`end_date`, the last window is left open and bookmarked at the "
+                "latest record synced."
+            ),
+        ),
+        th.Property(
+            "export_engine",
+            th.StringType,
+            allowed_values=["sync", "job"],
+            default="sync",
+            title="Export engine",
+            description=(
+                "How export streams request data: `sync` streams each export from "
+                "`/export/data.json`, whereas `job` starts an asynchronous export job "
+                "per export window and downloads the resulting files once complete."
+            ),
+        ),
+        th.Property(
+            "max_parallel_downloads",
+            th.IntegerType,
+            default=1,
+            title="Max parallel downloads",
+            description=(
+                "Maximum number of export windows (or export job files for the `job` "
+                "export engine) to download concurrently. Records and state are still "
+                "emitted in chronological order. Without `export_window_hours`, each "
+                "export is requested in a single window, so windows are not "
+                "downloaded concurrently."
+            ),
+        ),
+        th.Property(
+            "max_parallel_requests",
+            th.IntegerType,
+            default=1,
+            title="Max parallel requests",
+            description=(
+                "Maximum number of parent records (lists, email templates or "
+                "metadata tables and keys) to request child stream records for "
+                "concurrently. Records are still emitted in parent record order."
+            ),
+        ),
+        th.Property(
+            "stream_exports",
+            th.BooleanType,
+            default=False,
+            title="Stream exports",
+            description=(
+                "Process export records as they are downloaded, rather than writing "
+                "the full response to disk first. Not applicable to concurrent "
+                "downloads (see `max_parallel_downloads`)."
+            ),
+        ),
+        th.Property(
+            "stream_buffer_mb",
+            th.IntegerType,
+            default=100,
+            title="Stream buffer size (MB)",
+            description=(
+                "Maximum size in MB of streamed export content to buffer in memory, "
+                "after which content is spilled to disk (see `stream_exports`)"
+            ),
+        ),
+        th.Property(
+            "export_spool_dir",
+            th.StringType,
+            title="Export spool directory",
+            description=(
+                "Directory to keep downloaded exports in until the bookmark has "
+                "advanced past them, so an interrupted sync resumes from the last "
+                "emitted state instead of downloading them again. Applies to the "
+                "`sync` export engine when `stream_exports` is not enabled. Files are "
+                "written to a temporary directory and removed once processed if not "
+                "set."
+            ),
+        ),
+        th.Property(
+            "spool_compression",
+            th.StringType,
+            allowed_values=list(spool.COMPRESSIONS),
+            default="none",
+            title="Spool compression",
+            description=(
+                "Compression format for downloaded export files written to disk. "
+                "`gzip` content received gzip-encoded is written as-is. `zstd` "
+                "requires the `zstd` package extra to be installed."
+            ),
+        ),
+        th.Property(
+            "export_dedupe_max_keys",
+            th.IntegerType,
+            default=1000,
+            title="Export deduplication max keys",
+            description=(
+                "Maximum number of primary keys of export records at the latest "
+                "replication key value to keep, in order to drop the same records "
+                "exported again by the next export window or sync. Keys are only "
+                "persisted in state for records at the bookmark (i.e. sharing the "
+                "timestamp of the window end), as 8-byte digests. Set to `0` to "
+                "disable deduplication."
+            ),
+        ),
+        th.Property(
+            "export_decode_workers",
+            th.IntegerType,
+            default=1,
+            title="Export decode workers",
+            description=(
+                "Number of worker processes to decode (and transform) records of "
+                "downloaded export files in, in chunks split at record boundaries. "
+                "Records are still emitted in order. Not applicable to streamed "
+                "exports (see `stream_exports`) or Parquet batch files."
+            ),
+        ),
+        th.Property(
+            "export_decode_chunk_mb",
+            th.IntegerType,
+            default=16,
+            title="Export decode chunk size (MB)",
+            description=(
+                "Size in MB of the chunks of downloaded export files decoded by each "
+                "worker process at a time (see `export_decode_workers`)"
+            ),
+        ),
+        th.Property(
+            "temp_dir",
+            th.StringType,
+            title="Temporary directory",
+            description=(
+                "Directory to write temporary files to (e.g. downloaded exports and "
+                "spilled response buffers), if not the system default"
+            ),
+        ),
+        th.Property(
+            "json_decoder",
+            th.StringType,
+            allowed_values=list(decoders.BACKENDS),
+            default="json",
+            title="JSON decoder",
+            description=(
+                "JSON decoder backend used to parse responses. `msgspec` and `orjson` "
+                "require the respective package extra to be installed. `orjson` is "
+                "only used for streams without floating-point number properties, in "
+                "order to preserve precision."
+            ),
+        ),
+        th.Property(
+            "email_template_cache_dir",
+            th.StringType,
+            title="Email template cache directory",
+            description=(
+                "Directory to cache email template content in across runs, so only "
+                "templates updated since they were cached are requested. Caching is "
+                "disabled if not set."
+            ),
+        ),
+        th.Property(
+            "email_template_cache_size",
+            th.IntegerType,
+            default=10000,
+            title="Email template cache size",
+            description=(
+                "Maximum number of email templates to cache, after which the least "
+                "recently used are evicted (see `email_template_cache_dir`)"
+            ),
+        ),
+        th.Property(
+            "rate_limits",
+            th.ObjectType(additional_properties=th.NumberType),
+            title="Rate limits",
+            description=(
+                "Maximum requests per minute by API path (e.g. `/lists/getUsers`), "
+                "shared by all streams. Path segments in braces (e.g. `{table}`) "
+                "match any value. No paths are limited by default, so requests are "
+                "only slowed down by retrying responses with a `429` status, with "
+                "exponential backoff (see the README for Iterable's documented "
+                "limits)."
+            ),
+        ),
+        th.Property(
+            "http_pool_size",
+            th.IntegerType,
+            title="HTTP pool size",
+            description=(
+                "Maximum number of connections to keep alive per host, shared by all "
+                "streams. Defaults to enough for every concurrent request (see "
+                "`max_parallel_streams`, `max_parallel_downloads` and "
+                "`max_parallel_requests`)."
+            ),
+        ),
+        th.Property(
+            "http_connect_timeout",
+            th.NumberType,
+            default=30,
+            title="HTTP connect timeout",
+            description="Seconds to wait to connect to the API before retrying",
+        ),
+        th.Property(
+            "http_read_timeout",
+            th.NumberType,
+            default=300,
+            title="HTTP read timeout",
+            description=(
+                "Seconds to wait for the API to send any response content before "
+                "retrying (e.g. while an export is prepared)"
+            ),
+        ),
+        th.Property(
+            "download_chunk_kb",
+            th.IntegerType,
+            default=1024,
+            title="Download chunk size (KB)",
+            description=(
+                "Size in KB of the chunks export downloads are read and written to "
+                "disk in"
+            ),
+        ),
+        th.Property(
+            "max_parallel_streams",
+            th.IntegerType,
+            default=1,
+            title="Max parallel streams",
+            description=(
+                "Maximum number of top-level streams to request records for "
+                "concurrently, as records for the streams synced next are requested "
+                "while a stream is synced. Streams are still synced (so records and "
+                "state emitted) one at a time, in order; only their requests are "
+                "made ahead. Up to `max_parallel_downloads` windows of each export "
+                "stream synced next are downloaded (or their export jobs started) "
+                "ahead, and the rest as the stream is synced. Export streams without "
+                "a `start_date` or bookmark are only requested as they are synced."
+            ),
+        ),
+        th.Property(
+            "metrics_textfile",
+            th.StringType,
+            title="Metrics textfile",
+            description=(
+                "Path of a file to write per-stream sync performance metrics to in "
+                "Prometheus text format (e.g. for the node exporter textfile "
+                "collector), once all streams have synced. Metrics are always logged "
+                "as Singer METRIC log lines."
+            ),
+        ),
+        th.Property(
+            "dry_run",
+            th.BooleanType,
+            default=False,
+            title="Dry run",
+            description=(
+                "Log the estimated minimum number of requests to sync each selected "
+                "stream (and any parent stream it needs), rather than syncing. "
+                "Requests for child streams are estimated per parent record, as "
+                "parent records are not requested, so are not exact counts. Parent "
+                "stream records that no selected stream needs are never requested."
+            ),
+        ),
+        th.Property(
+            "profile_dir",
+            th.StringType,
+            title="Profile directory",
+            description=(
+                "Directory to write a CPU profile (`<stream>.prof`) and memory "
+                "allocation snapshot (`<stream>.tracemalloc`) of each top-level "
+                "stream sync to, including its child streams. The functions most time "
+                "was spent in and the largest allocation sites are also logged. "
+                "Profiling slows syncs down considerably, so is only intended for "
+                "diagnosing slow syncs."
+            ),
+        ),
+        th.Property(
+            "profile_top",
+            th.IntegerType,
+            default=20,
+            title="Profile top",
+            description=(
+                "Number of functions and allocation sites to log for each stream "
+                "profile (see `profile_dir`)"
+            ),
+        ),
     ).to_dict()
 
+    @cached_property
+    def rate_limiter(self) -> ratelimit.RateLimiter:
+        """Rate limiter shared by all streams."""
+        return ratelimit.RateLimiter(self.config.get("rate_limits", {}))
+
+    @cached_property
+    def transport(self) -> transport.Transport:
+        """HTTP transport shared by all streams."""
+        # one connection per request sent concurrently, with the `requests` default
+        # as a minimum
+        pool_size = self.config.get("http_pool_size") or max(
+            10,
+            self.max_parallel_streams
+            * max(
+                self.config.get("max_parallel_downloads") or 1,
+                self.config.get("max_parallel_requests") or 1,
+            ),
+        )
+
+        return transport.Transport(
+            api_key=self.config["api_key"],
+            pool_size=pool_size,
+            connect_timeout=self.config.get("http_connect_timeout", 30),
+            read_timeout=self.config.get("http_read_timeout", 300),
+            chunk_size=self.config.get("download_chunk_kb", 1024) * 1024,
+        )
+
+    # whether the request plan has been logged, in a dry run (see `log_request_plan`)
+    _request_plan_logged = False
+
+    # whether the sync has finished or failed (see `_end_sync`)
+    _sync_ended = False
+
+    @cached_property
+    def max_parallel_streams(self) -> int:
+        """Maximum number of top-level streams to request records for concurrently."""
+        return self.config.get("max_parallel_streams") or 1
+
+    @cached_property
+    def dry_run(self) -> bool:
+        """Whether to only log the requests planned to sync, rather than syncing."""
+        return self.config.get("dry_run", False)
+
     @override
-    def discover_streams(self) -> list[streams.IterableStream]:
+    def write_message(self, message):
+        # nothing is synced in a dry run, so nothing is written
+        if not self.dry_run:
+            super().write_message(message)
+
+    def log_request_plan(self):
+        """Log the requests planned to sync all selected streams, once per sync."""
+        if self._request_plan_logged:
+            return
+
+        self._request_plan_logged = True
+
+        for name, estimate in planner.plan_requests(self.streams.values()).items():
+            self.logger.info("Planned requests for '%s': %s", name, estimate)
+
+    def prefetch_streams(self, stream: Stream):
+        """Request records for the streams synced after a stream ahead of their sync.
+
+        Records are requested for up to `max_parallel_streams` top-level streams
+        (including the stream being synced, or its top-level ancestor) concurrently.
+        Streams are still synced one at a time, in order, so records and state are
+        only written by the stream being synced.
+
+        Args:
+            stream: The stream being synced.
+        """
+        if self.max_parallel_streams <= 1:
+            return
+
+        self.rate_limiter  # noqa: B018 - initialise before use from multiple threads
+        self.transport  # noqa: B018
+
+        while stream.parent_stream_type:
+            stream = self._streams_by_type[stream.parent_stream_type]
+
+        sync_streams = self._sync_streams
+        i = sync_streams.index(stream)
+
+        for s in sync_streams[i + 1 : i + self.max_parallel_streams]:
+            if isinstance(s, streams.IterableStream):
+                s.prefetch_sync()
+
+    @cached_property
+    def _sync_streams(self) -> list[Stream]:
+        # top-level streams, in the order `sync_all` syncs them
         return [
-            streams._MessageMediumsStream(self),  # noqa: SLF001
-            streams._MetadataStream(self),  # noqa: SLF001
-            streams._MetadataTablesStream(self),  # noqa: SLF001
-            streams.ListsStream(self),
-            streams.ListUsersStream(self),
-            streams.CampaignsStream(self),
-            streams.ChannelsStream(self),
-            streams.MessageTypesStream(self),
-            streams.TemplatesStream(self),
-            streams.EmailTemplatesStream(self),
-            streams.MetadataStream(self),
-            streams.EmailBounceStream(self),
-            streams.EmailClickStream(self),
-            streams.EmailComplaintStream(self),
-            streams.EmailOpenStream(self),
-            streams.EmailSendStream(self),
-            streams.EmailSendSkipStream(self),
-            streams.EmailSubscribeStream(self),
-            streams.EmailUnsubscribeStream(self),
-            streams.SMSBounceStream(self),
-            streams.SMSClickStream(self),
-            streams.SMSReceivedStream(self),
-            streams.SMSSendStream(self),
-            streams.SMSSendSkipStream(self),
-            streams.WebPushClickStream(self),
-            streams.WebPushSendStream(self),
-            streams.WebPushSendSkipStream(self),
-            streams.UsersStream(self),
-            streams.CustomEventStream(self),
+            s
+            for s in self.streams.values()
+            if not s.parent_stream_type and (s.selected or s.has_selected_descendents)
         ]
 
+    @cached_property
+    def _streams_by_type(self) -> dict[type[Stream], Stream]:
+        return {type(s): s for s in self.streams.values()}
+
+    def sync_finished(self, stream: streams.IterableStream):
+        """Write sync stats and release resources, once all streams are synced.
+
+        Called for each stream as it logs its sync costs, which the SDK does for all
+        streams once they are synced.
+
+        Args:
+            stream: The stream logging its sync costs.
+        """
+        if stream is self._iterable_streams[-1]:
+            self._end_sync()
+
+    def sync_failed(self):
+        """Write sync stats and release resources, once a stream sync fails.
+
+        Streams do not log their sync costs if any sync fails, so any records being
+        requested ahead of streams being synced are discarded here instead.
+        """
+        self._end_sync()
+
+    @cached_property
+    def _iterable_streams(self) -> list[streams.IterableStream]:
+        return [
+            s for s in self.streams.values() if isinstance(s, streams.IterableStream)
+        ]
+
+    def _end_sync(self):
+        if self._sync_ended:
+            return
+
+        self._sync_ended = True
+
+        # requests in progress are aborted (and any waiting for a rate limit sent, so
+        # fail) first, so threads requesting records ahead are not waited for
+        self.transport.close()
+        self.rate_limiter.close()
+
+        for stream in self._iterable_streams:
+            stream.close_prefetch()
+
+        if not self.dry_run:
+            self._write_sync_stats()
+
+    def _write_sync_stats(self):
+        sync_stats = {
+            stream.name: stream.sync_stats
+            for stream in self.streams.values()
+            if isinstance(stream, streams.IterableStream)
+            and (stream.selected or stream.has_selected_descendents)
+        }
+
+        for name, stream_stats in sync_stats.items():
+            stream_stats.log({metrics.Tag.STREAM: name})
+
+        if filepath := self.config.get("metrics_textfile"):
+            stats.write_prometheus_textfile(filepath, sync_stats)
+
+    stream_types: t.ClassVar[tuple[type[Stream], ...]] = (
+        streams._MessageMediumsStream,  # noqa: SLF001
+        streams._MetadataStream,  # noqa: SLF001
+        streams._MetadataTablesStream,  # noqa: SLF001
+        streams.ListsStream,
+        streams.ListUsersStream,
+        streams.CampaignsStream,
+        streams.ChannelsStream,
+        streams.MessageTypesStream,
+        streams.TemplatesStream,
+        streams.EmailTemplatesStream,
+        streams.MetadataStream,
+        streams.EmailBounceStream,
+        streams.EmailClickStream,
+        streams.EmailComplaintStream,
+        streams.EmailOpenStream,
+        streams.EmailSendStream,
+        streams.EmailSendSkipStream,
+        streams.EmailSubscribeStream,
+        streams.EmailUnsubscribeStream,
+        streams.SMSBounceStream,
+        streams.SMSClickStream,
+        streams.SMSReceivedStream,
+        streams.SMSSendStream,
+        streams.SMSSendSkipStream,
+        streams.WebPushClickStream,
+        streams.WebPushSendStream,
+        streams.WebPushSendSkipStream,
+        streams.UsersStream,
+        streams.CustomEventStream,
+    )
+
+    @cached_property
+    def required_stream_types(self) -> list[type[Stream]]:
+        """Stream types to load, in discovery order.
+
+        All stream types are loaded for discovery. Given a catalog, streams deselected
+        in it are not loaded (so neither is their schema), unless required to generate
+        contexts for a selected child stream.
+        """
+        if self.input_catalog is None:
+            return list(self.stream_types)
+
+        required: set[type[Stream]] = set()
+
+        for stream_type in self.stream_types:
+            # stream names are class attributes, though typed as instance attributes
+            name = t.cast("str", getattr(stream_type, "name"))  # noqa: B009
+            entry = self.input_catalog.get_stream(name)
+
+            if entry and not entry.metadata.resolve_selection()[()]:
+                continue
+
+            required_type: type[Stream] | None = stream_type
+
+            while required_type and required_type not in required:
+                required.add(required_type)
+                required_type = required_type.parent_stream_type
+
+        return [s for s in self.stream_types if s in required]
+
+    @override
+    @property
+    def catalog(self):
+        catalog = super().catalog
+
+        if self.input_catalog is None:
+            return catalog
+
+        # only streams that are loaded need stream maps (see `setup_mapper`)
+        names = {s.name for s in self.required_stream_types}
+        return type(catalog)((k, v) for k, v in catalog.items() if k in names)
+
+    @override
+    def discover_streams(self) -> list[Stream]:
+        return [stream_type(self) for stream_type in self.required_stream_types]
+
 
 if __name__ == "__main__":
     TapIterable.cli()
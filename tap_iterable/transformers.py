@@ -0,0 +1,161 @@
+"""Record transformers, built once per stream and applied to every record.
+
+Transformers are partial applications of module-level functions rather than closures,
+so they can be pickled and sent to worker processes (see `parallel.DecodePool`).
+"""
+
+from __future__ import annotations
+
+import json
+import typing as t
+from datetime import datetime, timezone
+from functools import lru_cache, partial
+
+Transformer = t.Callable[[dict], dict]
+
+
+def identity(row: dict) -> dict:
+    """Return the record unchanged.
+
+    Args:
+        row: Individual record in the stream.
+
+    Returns:
+        The same record.
+    """
+    return row
+
+
+def chain(*transformers: Transformer) -> Transformer:
+    """Combine transformers into one, applied in the order given.
+
+    Args:
+        transformers: Transformers to combine.
+
+    Returns:
+        A single transformer.
+    """
+    transformers = tuple(f for f in transformers if f is not identity)
+
+    if not transformers:
+        return identity
+
+    if len(transformers) == 1:
+        return transformers[0]
+
+    return partial(_chain, transformers)
+
+
+def _chain(transformers: tuple[Transformer, ...], row: dict) -> dict:
+    for f in transformers:
+        row = f(row)
+
+    return row
+
+
+def timestamps_to_iso(properties: t.Iterable[str]) -> Transformer:
+    """Convert millisecond timestamp property values to ISO 8601 strings.
+
+    Args:
+        properties: Names of the properties to convert.
+
+    Returns:
+        A transformer.
+    """
+    properties = tuple(properties)
+
+    if not properties:
+        return identity
+
+    return partial(_timestamps_to_iso, properties)
+
+
+def _timestamps_to_iso(properties: tuple[str, ...], row: dict) -> dict:
+    for name in properties:
+        value = row.get(name)
+
+        if value and isinstance(value, int):
+            row[name] = _timestamp_to_iso(value)
+
+    return row
+
+
+def decode_json_strings(
+    properties: t.Iterable[str],
+    decode: t.Callable[[str], t.Any] = json.loads,
+) -> Transformer:
+    """Decode JSON-encoded string property values.
+
+    Args:
+        properties: Names of the properties to decode.
+        decode: JSON decode function.
+
+    Returns:
+        A transformer.
+    """
+    properties = tuple(properties)
+
+    if not properties:
+        return identity
+
+    if len(properties) == 1:
+        (name,) = properties
+        return partial(_decode_json_string, name, decode)
+
+    return partial(_decode_json_strings, properties, decode)
+
+
+def _decode_json_string(name: str, decode: t.Callable, row: dict) -> dict:
+    if value := row.get(name):
+        row[name] = decode(value)
+
+    return row
+
+
+def _decode_json_strings(
+    properties: tuple[str, ...],
+    decode: t.Callable,
+    row: dict,
+) -> dict:
+    for name in properties:
+        if value := row.get(name):
+            row[name] = decode(value)
+
+    return row
+
+
+def nest_unknown_properties(properties: t.Iterable[str], name: str) -> Transformer:
+    """Move properties not in `properties` under a single object property.
+
+    Args:
+        properties: Names of known properties.
+        name: Name of the property to nest unknown properties under.
+
+    Returns:
+        A transformer.
+    """
+    return partial(_nest_unknown_properties, frozenset(properties), name)
+
+
+def _nest_unknown_properties(properties: frozenset[str], name: str, row: dict) -> dict:
+    record = {}
+    unknown = {}
+
+    for key, value in row.items():
+        if key in properties:
+            record[key] = value
+        else:
+            unknown[key] = value
+
+    record[name] = unknown
+    return record
+
+
+@lru_cache(maxsize=2**16)
+def _timestamp_to_iso(value: int) -> str:
+    date_time = datetime.fromtimestamp(
+        value / 1000,  # assume timestamp in milliseconds
+        tz=timezone.utc,
+    )
+
+    return date_time.isoformat()
@@ -0,0 +1,162 @@
+"""HTTP transport shared by all streams of the tap."""
+
+from __future__ import annotations
+
+import contextlib
+import socket
+import threading
+import typing as t
+import weakref
+from functools import cached_property
+
+import requests
+from requests.adapters import HTTPAdapter
+from singer_sdk.authenticators import APIKeyAuthenticator
+
+if t.TYPE_CHECKING:
+    from singer_sdk.streams import RESTStream
+    from urllib3.connectionpool import HTTPConnectionPool
+
+
+class TransportClosedError(Exception):
+    """Request sent (or aborted) after the transport was closed."""
+
+
+class Transport:
+    """HTTP session, authentication and download tuning shared by all streams.
+
+    Every stream sends requests through the same session, so connections are kept
+    alive and reused across streams (and the threads syncing them), rather than
+    opened again by each stream. Response content is requested compressed with any
+    content encoding `requests` can decode (e.g. `gzip`).
+
+    Once closed, requests in progress are aborted and no further requests can be
+    sent, so threads requesting records ahead of them being synced finish promptly
+    (e.g. when a sync fails).
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        pool_size: int,
+        connect_timeout: float,
+        read_timeout: float,
+        chunk_size: int,
+    ) -> None:
+        """Initialise the transport.
+
+        Args:
+            api_key: Iterable API key.
+            pool_size: Maximum number of connections to keep alive per host.
+            connect_timeout: Seconds to wait to connect to a host.
+            read_timeout: Seconds to wait for a host to send any response content.
+            chunk_size: Number of bytes to read response content in at a time, when
+                downloaded rather than read whole.
+        """
+        self.api_key = api_key
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.chunk_size = chunk_size
+
+        self.closed = False
+
+        self._authenticator: APIKeyAuthenticator | None = None
+        self._lock = threading.Lock()
+        self._connections: weakref.WeakSet = weakref.WeakSet()
+
+    @cached_property
+    def session(self) -> requests.Session:
+        """Session to send every request with."""
+        session = requests.Session()
+
+        # every thread sending requests concurrently can keep its connection alive
+        adapter = _TrackingAdapter(self, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        return session
+
+    def get_authenticator(self, stream: RESTStream) -> APIKeyAuthenticator:
+        """Get the authenticator shared by all streams.
+
+        Args:
+            stream: Stream to create the authenticator for, if not already created.
+
+        Returns:
+            The authenticator.
+        """
+        with self._lock:
+            if not self._authenticator:
+                self._authenticator = APIKeyAuthenticator.create_for_stream(
+                    stream,
+                    key="Api-Key",
+                    value=self.api_key,
+                    location="header",
+                )
+
+            return self._authenticator
+
+    def close(self) -> None:
+        """Close any connections kept alive, aborting any requests in progress."""
+        with self._lock:
+            self.closed = True
+            connections = list(self._connections)
+
+        # shut down rather than closed, as sockets may be in use by other threads,
+        # which then fail to send or receive
+        for connection in connections:
+            if sock := connection.sock:
+                with contextlib.suppress(OSError):  # e.g. already disconnected
+                    sock.shutdown(socket.SHUT_RDWR)
+
+        if "session" in self.__dict__:
+            self.session.close()
+
+    def _track_connection(self, connection) -> None:
+        # called once connected, so connections are either aborted by `close` or
+        # here, if closed while connecting
+        with self._lock:
+            if not self.closed:
+                self._connections.add(connection)
+                return
+
+        connection.close()
+        msg = "Transport is closed"
+        raise TransportClosedError(msg)
+
+
+class _TrackingAdapter(HTTPAdapter):
+    # tracks every connection opened by the transport, so requests in progress can
+    # be aborted (see `Transport.close`)
+
+    def __init__(self, transport: Transport, **kwargs) -> None:
+        self._transport = transport
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: _tracking_pool_class(pool_class, self._transport)
+            for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+
+def _tracking_pool_class(
+    pool_class: type[HTTPConnectionPool],
+    transport: Transport,
+) -> type[HTTPConnectionPool]:
+    class TrackingConnectionPool(pool_class):  # type: ignore[valid-type, misc]
+        def _new_conn(self):
+            connection = super()._new_conn()
+            connect = connection.connect
+
+            def track_connect() -> None:
+                connect()
+                transport._track_connection(connection)  # noqa: SLF001
+
+            connection.connect = track_connect
+            return connection
+
+    return TrackingConnectionPool
@@ -0,0 +1,24 @@
+"""Test fixtures for tap-iterable."""
+
+from __future__ import annotations
+
+import typing as t
+
+import pytest
+
+from tap_iterable.client import IterableStream
+from tests.fake_iterable import FakeIterable
+
+
+@pytest.fixture
+def iterable(
+    request: pytest.FixtureRequest,
+    monkeypatch: pytest.MonkeyPatch,
+) -> t.Iterator[FakeIterable]:
+    """Point all streams at a local fake Iterable API.
+
+    Pass keyword arguments for `FakeIterable` by indirect parametrization.
+    """
+    with FakeIterable(**getattr(request, "param", {})) as api:
+        monkeypatch.setattr(IterableStream, "url_base", api.api_url)
+        yield api
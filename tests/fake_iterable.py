@@ -0,0 +1,426 @@
+"""Local stand-in for the Iterable API, serving synthetic data."""
+
+from __future__ import annotations
+
+import gzip
+import itertools
+import json
+import re
+import threading
+import time
+import typing as t
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from typing_extensions import Self
+
+DATE_TIME_FORMAT = r"%Y-%m-%d %H:%M:%S"
+
+
+class FakeIterable:
+    """Serve synthetic Iterable API responses from a local HTTP server."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        start_date: datetime = datetime(2024, 1, 1, tzinfo=timezone.utc),
+        end_date: datetime = datetime(2024, 1, 2, tzinfo=timezone.utc),
+        records_per_hour: int = 1,
+        latency: float = 0,
+        job_files: int = 3,
+        lists: int = 3,
+        list_users: int = 5,
+        metadata_tables: int = 2,
+        metadata_keys: int = 3,
+        templates: int = 3,
+        campaigns: int = 3,
+        inclusive_end: bool = False,
+        connection_resets: int = 0,
+    ) -> None:
+        """Initialise the fake API.
+
+        Args:
+            start_date: Earliest export record timestamp.
+            end_date: Latest export record timestamp (exclusive).
+            records_per_hour: Number of export records generated per hour.
+            latency: Seconds to wait before responding to each request.
+            job_files: Number of files each export job result is split into.
+            lists: Number of lists.
+            list_users: Number of users per list.
+            metadata_tables: Number of metadata tables.
+            metadata_keys: Number of keys per metadata table.
+            templates: Number of templates per message medium.
+            campaigns: Number of campaigns.
+            inclusive_end: Whether exports include records at the requested end date,
+                as for the Iterable API.
+            connection_resets: Number of export responses to reset the connection of
+                part way through sending the body.
+        """
+        self.start_date = start_date
+        self.end_date = end_date
+        self.records_per_hour = records_per_hour
+        self.latency = latency
+        self.job_files = job_files
+        self.lists = lists
+        self.list_users = list_users
+        self.metadata_tables = metadata_tables
+        self.metadata_keys = metadata_keys
+        self.templates = templates
+        self.campaigns = campaigns
+        self.inclusive_end = inclusive_end
+        self.connection_resets = connection_resets
+        self.template_updates: dict[int, int] = {}
+
+        self.requests: list[tuple[str, str]] = []
+        self.connections = 0
+        self.jobs: dict[int, dict] = {}
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """Base URL of the fake server."""
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self) -> str:
+        """Base URL of the fake API."""
+        return f"{self.url}/api"
+
+    def __enter__(self) -> Self:  # noqa: D105
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:  # noqa: D105
+        self._server.shutdown()
+        self._server.server_close()
+
+    def export_records(
+        self,
+        data_type_name: str,
+        params: dict[str, str],
+    ) -> t.Iterator[dict]:
+        """Generate synthetic export records for the requested date range.
+
+        Args:
+            data_type_name: Iterable export data type name.
+            params: Export request parameters.
+
+        Yields:
+            A record at every `1 / records_per_hour` hour interval in the date
+            range, with only the fields requested (by comma-separated `onlyFields`
+            or `omitFields`).
+        """
+        start_date = _parse_date_time(params.get("startDateTime")) or self.start_date
+        end_date = _parse_date_time(params.get("endDateTime")) or self.end_date
+        end_date = min(end_date, self.end_date)
+
+        interval = timedelta(hours=1) / self.records_per_hour
+        first = max(-(-(start_date - self.start_date) // interval), 0)  # round up
+        last = -(-(end_date - self.start_date) // interval)
+
+        if self.inclusive_end and end_date < self.end_date:
+            last = (end_date - self.start_date) // interval + 1
+
+        only_fields = params.get("onlyFields")
+        omit_fields = set(params.get("omitFields", "").split(","))
+
+        for i in range(first, last):
+            record = _export_record(data_type_name, i, self.start_date + i * interval)
+
+            if only_fields:
+                yield {k: v for k, v in record.items() if k in only_fields.split(",")}
+            else:
+                yield {k: v for k, v in record.items() if k not in omit_fields}
+
+    def reset_connection(self, url: str) -> bool:
+        """Check whether to reset the connection part way through a response.
+
+        Args:
+            url: Request URL path and query string.
+
+        Returns:
+            Whether to reset the connection, for the next `connection_resets` export
+            responses.
+        """
+        if not urlparse(url).path.startswith("/api/export/data"):
+            return False
+
+        with self._lock:
+            if self.connection_resets <= 0:
+                return False
+
+            self.connection_resets -= 1
+            return True
+
+    def route(self, method: str, url: str, body: bytes) -> tuple[int, bytes]:
+        """Route a request to its handler.
+
+        Args:
+            method: HTTP method.
+            url: Request URL path and query string.
+            body: Request body.
+
+        Returns:
+            A tuple of the response status code and body.
+        """
+        self.requests.append((method, url))
+        parsed = urlparse(url)
+        params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+
+        for route_method, pattern, handler in self._routes:
+            if method == route_method and (match := re.fullmatch(pattern, parsed.path)):
+                return handler(self, params, body, **match.groupdict())
+
+        return HTTPStatus.NOT_FOUND, b""
+
+    def _export_data(self, params: dict[str, str], _):
+        records = self.export_records(params["dataTypeName"], params)
+        return HTTPStatus.OK, _json_lines(records)
+
+    def _export_start(self, _, body: bytes):
+        job_id = next(self._job_ids)
+        self.jobs[job_id] = {"params": json.loads(body), "polls": 0}
+        return HTTPStatus.OK, json.dumps({"jobId": job_id}).encode()
+
+    def _export_files(self, params: dict[str, str], _, job_id: str):
+        job = self.jobs[int(job_id)]
+        job["polls"] += 1
+
+        if job["polls"] == 1:
+            return HTTPStatus.OK, json.dumps(
+                {"jobState": "running", "files": []}
+            ).encode()
+
+        files = [
+            {
+                "file": f"{job_id}-{i}.json.gz",
+                "url": f"{self.url}/files/{job_id}/{i}",
+            }
+            for i in range(self.job_files)
+        ]
+
+        if start_after := params.get("startAfter"):
+            files = files[[f["file"] for f in files].index(start_after) + 1 :]
+
+        return HTTPStatus.OK, json.dumps(
+            {"exportJobId": int(job_id), "jobState": "completed", "files": files}
+        ).encode()
+
+    def _export_file(self, _, __, job_id: str, part: str):
+        params = self.jobs[int(job_id)]["params"]
+        records = list(self.export_records(params["dataTypeName"], params))
+        size = -(-len(records) // self.job_files)
+        part_records = records[int(part) * size : (int(part) + 1) * size]
+
+        return HTTPStatus.OK, gzip.compress(_json_lines(part_records))
+
+    def _lists(self, *_):
+        lists = [
+            {
+                "id": i,
+                "name": f"List {i}",
+                "createdAt": int(self.start_date.timestamp() * 1000),
+                "listType": "Standard",
+            }
+            for i in range(1, self.lists + 1)
+        ]
+
+        return HTTPStatus.OK, json.dumps({"lists": lists}).encode()
+
+    def _list_users(self, params: dict[str, str], _):
+        list_id = int(params["listId"])
+        emails = (f"user{i}@list{list_id}.example.com" for i in range(self.list_users))
+
+        return HTTPStatus.OK, "".join(f"{e}\n" for e in emails).encode()
+
+    def _metadata(self, *_):
+        tables = [{"name": f"table{i}"} for i in range(self.metadata_tables)]
+        return HTTPStatus.OK, json.dumps({"results": tables}).encode()
+
+    def _metadata_table(self, _, __, table: str):
+        keys = [{"key": f"{table}-key{i}"} for i in range(self.metadata_keys)]
+        return HTTPStatus.OK, json.dumps({"results": keys}).encode()
+
+    def _metadata_key(self, _, __, table: str, key: str):
+        return HTTPStatus.OK, json.dumps(
+            {
+                "table": table,
+                "key": key,
+                "size": 1,
+                "lastModified": self.start_date.isoformat(),
+                "value": {"key": key},
+            }
+        ).encode()
+
+    def _campaigns(self, *_):
+        created_at = int(self.start_date.timestamp() * 1000)
+        campaigns = [
+            {
+                "id": i,
+                "name": f"Campaign {i}",
+                "createdAt": created_at,
+                "updatedAt": created_at,
+                "templateId": i,
+                "messageMedium": "Email",
+                "campaignState": "Finished",
+                "listIds": [1],
+            }
+            for i in range(1, self.campaigns + 1)
+        ]
+
+        return HTTPStatus.OK, json.dumps({"campaigns": campaigns}).encode()
+
+    def _channels(self, *_):
+        channels = [
+            {
+                "id": i,
+                "name": medium,
+                "channelType": "Marketing",
+                "messageMedium": medium,
+            }
+            for i, medium in enumerate(["Email", "Push", "InApp", "SMS"], 1)
+        ]
+
+        return HTTPStatus.OK, json.dumps({"channels": channels}).encode()
+
+    def _message_types(self, *_):
+        message_types = [
+            {"id": i, "name": f"Message type {i}", "channelId": i} for i in range(1, 5)
+        ]
+
+        return HTTPStatus.OK, json.dumps({"messageTypes": message_types}).encode()
+
+    def _template_updated_at(self, template_id: int) -> int:
+        updated_at = self.start_date + timedelta(
+            hours=self.template_updates.get(template_id, 0)
+        )
+
+        return int(updated_at.timestamp() * 1000)
+
+    def _templates(self, params: dict[str, str], _):
+        offset = ["Email", "Push", "InApp", "SMS"].index(params["messageMedium"])
+        templates = [
+            {
+                "templateId": template_id,
+                "name": f"Template {template_id}",
+                "updatedAt": self._template_updated_at(template_id),
+            }
+            for i in range(self.templates)
+            if (template_id := offset * self.templates + i + 1)
+        ]
+
+        return HTTPStatus.OK, json.dumps({"templates": templates}).encode()
+
+    def _email_template(self, params: dict[str, str], _):
+        template_id = int(params["templateId"])
+        updated_at = self._template_updated_at(template_id)
+
+        return HTTPStatus.OK, json.dumps(
+            {
+                "templateId": template_id,
+                "metadata": {"templateId": template_id, "updatedAt": updated_at},
+                "html": f"<p>{template_id}@{updated_at}</p>",
+            }
+        ).encode()
+
+    _routes: t.ClassVar = [
+        ("GET", r"/api/lists", _lists),
+        ("GET", r"/api/lists/getUsers", _list_users),
+        ("GET", r"/api/campaigns", _campaigns),
+        ("GET", r"/api/channels", _channels),
+        ("GET", r"/api/messageTypes", _message_types),
+        ("GET", r"/api/templates", _templates),
+        ("GET", r"/api/templates/email/get", _email_template),
+        ("GET", r"/api/metadata", _metadata),
+        ("GET", r"/api/metadata/(?P<table>[^/]+)", _metadata_table),
+        ("GET", r"/api/metadata/(?P<table>[^/]+)/(?P<key>[^/]+)", _metadata_key),
+        ("GET", r"/api/export/data\.json", _export_data),
+        ("POST", r"/api/export/start", _export_start),
+        ("GET", r"/api/export/(?P<job_id>\d+)/files", _export_files),
+        ("GET", r"/files/(?P<job_id>\d+)/(?P<part>\d+)", _export_file),
+    ]
+
+
+def _handler(api: FakeIterable) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        # headers and body are sent separately, so avoid delayed ACKs on keep-alive
+        # connections adding latency to every request
+        disable_nagle_algorithm = True
+
+        def setup(self) -> None:
+            super().setup()
+
+            with api._lock:  # noqa: SLF001
+                api.connections += 1
+
+        def _respond(self, method: str) -> None:
+            time.sleep(api.latency)
+
+            length = int(self.headers.get("Content-Length") or 0)
+            status, body = api.route(method, self.path, self.rfile.read(length))
+
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+
+            if api.reset_connection(self.path):
+                # part of a record is sent before the connection is closed
+                self.wfile.write(body[: len(body) // 2])
+                self.close_connection = True
+                return
+
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:  # noqa: N802
+            self._respond("GET")
+
+        def do_POST(self) -> None:  # noqa: N802
+            self._respond("POST")
+
+        def log_message(self, *args) -> None:
+            pass
+
+    return Handler
+
+
+def _parse_date_time(value: str | None) -> datetime | None:
+    if not value:
+        return None
+
+    return datetime.strptime(value, DATE_TIME_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def _export_record(data_type_name: str, index: int, date_time: datetime) -> dict:
+    created_at = date_time.strftime(DATE_TIME_FORMAT) + " +00:00"
+    email = f"user{index % 1000}@example.com"
+
+    if data_type_name == "user":
+        return {
+            "email": email,
+            "profileUpdatedAt": created_at,
+            "signupDate": created_at,
+            "favouriteColour": "blue",
+        }
+
+    return {
+        "createdAt": created_at,
+        "messageId": f"{data_type_name}-{index}",
+        "email": email,
+        "campaignId": index % 100,
+        "templateId": index % 50,
+        "messageTypeId": 1,
+        "transactionalData": json.dumps({"index": index}),
+    }
+
+
+def _json_lines(records: t.Iterable[dict]) -> bytes:
+    return b"".join(json.dumps(r).encode() + b"\n" for r in records)
@@ -0,0 +1,77 @@
+"""Tests response buffering for streamed exports."""
+
+from __future__ import annotations
+
+import io
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+from tap_iterable.buffer import SpillBuffer
+
+
+def _response(content: bytes):
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(content)
+    return response
+
+
+@pytest.mark.parametrize(
+    ("max_memory", "spilled"),
+    [
+        pytest.param(1024**2, False, id="memory"),
+        pytest.param(64, True, id="spilled"),
+    ],
+)
+def test_iter_lines(max_memory: int, *, spilled: bool):
+    lines = [json.dumps({"id": i}).encode() for i in range(1000)]
+    response = _response(b"\n".join(lines) + b"\n")
+
+    with SpillBuffer(max_memory=max_memory, chunk_size=10) as buffer:
+        buffer.download(response)  # download fully first to simulate a slow consumer
+        assert list(buffer.iter_lines()) == lines
+
+    assert buffer.spilled is spilled
+    assert bool(buffer.spill_duration) is spilled
+
+
+def test_download_error():
+    class _Raw(io.BytesIO):
+        def read(self, *_, **__):
+            raise requests.exceptions.ConnectionError
+
+    response = _response(b"")
+    response.raw = _Raw()
+
+    with SpillBuffer(max_memory=64) as buffer:
+        buffer.start(response)
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            list(buffer.iter_lines())
+
+
+def test_close_stalled_download():
+    stalled = threading.Event()
+
+    class _Raw(io.BytesIO):
+        def read(self, *_, **__):
+            stalled.set()
+            time.sleep(5)  # e.g. waiting for the read timeout
+            return b"{}\n"
+
+    response = _response(b"")
+    response.raw = _Raw()
+
+    buffer = SpillBuffer(max_memory=64)
+    buffer.close_timeout = 0.1
+    buffer.start(response)
+    stalled.wait()
+
+    # closing does not wait for the stalled download
+    start = time.monotonic()
+    buffer.close()
+    assert time.monotonic() - start < 1
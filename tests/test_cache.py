@@ -0,0 +1,68 @@
+"""Tests persistent response content caching."""
+
+from __future__ import annotations
+
+import os
+import typing as t
+
+from tap_iterable.cache import ContentCache
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def test_get_put(tmp_path: Path):
+    cache = ContentCache(tmp_path, max_entries=10)
+    assert cache.get("a") is None
+
+    cache.put("a", b"1")
+    cache.put("a", b"2")
+
+    assert cache.get("a") == b"2"
+    assert len(cache) == 1
+    assert ContentCache(tmp_path, max_entries=10).get("a") == b"2"
+
+
+def test_evict_least_recently_used(tmp_path: Path):
+    cache = ContentCache(tmp_path, max_entries=10)
+
+    for i in range(10):
+        cache.put(str(i), b"{}")
+        path = cache._path(str(i))  # noqa: SLF001
+        os.utime(path, ns=(i, i))
+
+    cache.get("0")  # mark as recently used
+    cache.put("10", b"{}")
+
+    assert len(cache) == 9
+    assert cache.get("0") is not None
+    assert cache.get("10") is not None
+    assert [cache.get(str(i)) for i in range(1, 3)] == [None, None]
+    assert all(cache.get(str(i)) is not None for i in range(3, 10))
+
+
+def test_get_empty_entry(tmp_path: Path):
+    cache = ContentCache(tmp_path, max_entries=10)
+    cache._path("a").touch()  # noqa: SLF001
+
+    assert cache.get("a") is None
+
+
+def test_get_evicted_entry(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    cache = ContentCache(tmp_path, max_entries=10)
+    cache.put("a", b"{}")
+    path = cache._path("a")  # noqa: SLF001
+
+    utime = os.utime
+
+    # the entry is evicted as it is marked as recently used
+    def evict_and_utime(*args, **kwargs):
+        path.unlink()
+        utime(*args, **kwargs)
+
+    monkeypatch.setattr(os, "utime", evict_and_utime)
+
+    assert cache.get("a") is None
+    assert not path.exists()
@@ -0,0 +1,106 @@
+"""Tests columnar decoding of export content."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from tap_iterable import columnar, stats, transformers
+
+pa = pytest.importorskip("pyarrow")
+
+PROPERTIES = {
+    "createdAt": {"type": ["null", "string"], "format": "date-time"},
+    "campaignId": {"type": ["null", "integer"]},
+    "transactionalData": {
+        "type": ["null", "object"],
+        "properties": {"price": {"type": ["null", "number"]}},
+    },
+}
+
+
+def _reader():
+    return columnar.TableReader(
+        PROPERTIES,
+        json_properties=["transactionalData"],
+        transformer=transformers.decode_json_strings(["transactionalData"]),
+    )
+
+
+def _content(records: list[dict]) -> bytes:
+    return b"".join(json.dumps(r).encode() + b"\n" for r in records)
+
+
+def test_arrow_type():
+    assert columnar.arrow_type(PROPERTIES["transactionalData"]) == pa.struct(
+        [pa.field("price", pa.float64())]
+    )
+    assert columnar.arrow_type({"type": ["null", "array"], "items": {}}) is None
+    assert columnar.arrow_type({"type": ["string", "integer"]}) is None
+
+
+def test_read():
+    records = [
+        {
+            "createdAt": "2024-01-01 00:00:00 +00:00",
+            "campaignId": 1,
+            "transactionalData": json.dumps({"price": 1, "sku": "a"}),
+        },
+        {"createdAt": "2024-01-01 00:00:01 +00:00", "transactionalData": ""},
+        {"createdAt": "2024-01-01 00:00:02 +00:00", "unknown": True},
+    ]
+    content = _content(records)
+    window_stats = stats.SyncStats()
+
+    # split content mid-record
+    chunks = [content[:10], content[10:]]
+    ((table, size),) = _reader().read(chunks, window_stats)
+
+    assert size == len(content)
+    assert table.schema.field("campaignId").type == pa.int64()
+    assert table.to_pylist() == [
+        {
+            "createdAt": "2024-01-01 00:00:00 +00:00",
+            "campaignId": 1,
+            "transactionalData": {"price": 1.0, "sku": "a"},
+            "unknown": None,
+        },
+        {
+            "createdAt": "2024-01-01 00:00:01 +00:00",
+            "campaignId": None,
+            "transactionalData": None,
+            "unknown": None,
+        },
+        {
+            "createdAt": "2024-01-01 00:00:02 +00:00",
+            "campaignId": None,
+            "transactionalData": None,
+            "unknown": True,
+        },
+    ]
+    assert window_stats.records_decoded == 3
+
+
+def test_read_blocks(monkeypatch: pytest.MonkeyPatch):
+    records = [{"createdAt": str(i), "campaignId": i} for i in range(10)]
+    content = _content(records)
+
+    reader = _reader()
+    monkeypatch.setattr(reader, "block_size", len(content) // 3)
+
+    chunks = [content[i : i + 10] for i in range(0, len(content), 10)]
+    tables = [table for table, _ in reader.read(chunks, stats.SyncStats())]
+
+    assert len(tables) > 1
+    assert [r["campaignId"] for r in pa.concat_tables(tables).to_pylist()] == (
+        list(range(10))
+    )
+
+
+def test_read_type_mismatch():
+    # decoded record by record, inferring types from values
+    records = [{"createdAt": "2024-01-01 00:00:00 +00:00", "campaignId": "a"}]
+    ((table, _),) = _reader().read([_content(records)], stats.SyncStats())
+
+    assert table.to_pylist() == records
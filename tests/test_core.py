@@ -1,22 +1,42 @@
 """Tests standard tap features using the built-in SDK tests library."""
 
-import datetime
+from __future__ import annotations
 
+import typing as t
+from datetime import datetime, timezone
+
+import pytest
 from singer_sdk.testing import get_tap_test_class
 
+from tap_iterable.client import IterableStream
 from tap_iterable.tap import TapIterable
+from tests.fake_iterable import FakeIterable
+
+START_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+END_DATE = datetime(2024, 1, 2, tzinfo=timezone.utc)
 
 SAMPLE_CONFIG = {
-    "start_date": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d"),
-    # TODO: Initialize minimal tap config
+    "api_key": "test",
+    "start_date": START_DATE.isoformat(),
+    "end_date": END_DATE.isoformat(),
 }
 
 
+@pytest.fixture(scope="module", autouse=True)
+def iterable() -> t.Iterator[FakeIterable]:
+    """Point all streams at a local fake Iterable API for the tests in this module.
+
+    Module-scoped, as the SDK test class syncs the tap once for all of its tests.
+    """
+    api = FakeIterable(start_date=START_DATE, end_date=END_DATE)
+
+    with api, pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(IterableStream, "url_base", api.api_url)
+        yield api
+
+
 # Run standard built-in tap tests from the SDK:
 TestTapIterable = get_tap_test_class(
     tap_class=TapIterable,
     config=SAMPLE_CONFIG,
 )
-
-
-# TODO: Create additional tests as appropriate for your tap.
@@ -0,0 +1,30 @@
+"""Tests JSON decoder backends."""
+
+from __future__ import annotations
+
+import decimal
+
+import pytest
+
+from tap_iterable import decoders
+
+
+@pytest.mark.parametrize("backend", decoders.BACKENDS)
+def test_exact_numbers(backend: str):
+    pytest.importorskip(backend)
+    decode = decoders.get_decoder(backend, exact_numbers=True)
+
+    assert decode(b'{"value": 1.10000000000000000001}') == {
+        "value": decimal.Decimal("1.10000000000000000001")
+    }
+
+
+def test_orjson():
+    orjson = pytest.importorskip("orjson")
+
+    assert decoders.get_decoder("orjson", exact_numbers=False) is orjson.loads
+
+
+def test_unsupported_backend():
+    with pytest.raises(ValueError, match="Unsupported JSON decoder backend"):
+        decoders.get_decoder("simplejson")
@@ -0,0 +1,110 @@
+"""Tests deduplication of export records."""
+
+from __future__ import annotations
+
+import base64
+
+import pytest
+
+from tap_iterable import dedupe
+
+
+def _record(created_at: str, message_id: str) -> dict:
+    return {"createdAt": created_at, "messageId": message_id}
+
+
+def _boundary_keys(max_keys: int = 10) -> dedupe.BoundaryKeys:
+    return dedupe.BoundaryKeys(["messageId"], "createdAt", max_keys=max_keys)
+
+
+def test_filter():
+    boundary_keys = _boundary_keys()
+    records = [
+        _record("2024-01-01 00:00:00 +00:00", "a"),
+        _record("2024-01-01 00:00:01 +00:00", "b"),
+        _record("2024-01-01 00:00:01 +00:00", "c"),
+        _record("2024-01-01 00:00:01 +00:00", "b"),
+        _record("2024-01-01 00:00:00 +00:00", "a"),  # not at the latest value
+    ]
+
+    assert [r["messageId"] for r in boundary_keys.filter(records)] == [
+        "a",
+        "b",
+        "c",
+        "a",
+    ]
+    assert boundary_keys.duplicate_count == 1
+
+
+def test_state():
+    boundary_keys = _boundary_keys()
+    list(boundary_keys.filter([_record("2024-01-01 00:00:01 +00:00", "a")]))
+
+    state = boundary_keys.to_state()
+    assert state["value"] == "2024-01-01 00:00:01 +00:00"
+
+    loaded = _boundary_keys()
+    loaded.load(state)
+
+    assert loaded.is_duplicate(_record("2024-01-01 00:00:01 +00:00", "a"))
+    assert not loaded.is_duplicate(_record("2024-01-01 00:00:01 +00:00", "b"))
+    assert len(base64.b64decode(loaded.to_state()["keys"])) == 2 * dedupe.DIGEST_SIZE
+
+    # keys at an earlier value are discarded
+    assert not loaded.is_duplicate(_record("2024-01-01 00:00:02 +00:00", "a"))
+    assert loaded.to_state() == {
+        "value": "2024-01-01 00:00:02 +00:00",
+        "keys": state["keys"],
+    }
+
+
+def test_max_keys():
+    boundary_keys = _boundary_keys(max_keys=2)
+    records = [_record("2024-01-01 00:00:00 +00:00", i) for i in "abcabc"]
+
+    # keys beyond the maximum are not tracked
+    assert [r["messageId"] for r in boundary_keys.filter(records)] == [
+        "a",
+        "b",
+        "c",
+        "c",
+    ]
+    keys = base64.b64decode(boundary_keys.to_state()["keys"])
+    assert len(keys) == 2 * dedupe.DIGEST_SIZE
+
+
+def test_filter_table():
+    pa = pytest.importorskip("pyarrow")
+
+    boundary_keys = _boundary_keys()
+    boundary_keys.load(
+        {
+            "value": "2024-01-01 00:00:00 +00:00",
+            "keys": _boundary_keys_state("2024-01-01 00:00:00 +00:00", "a")["keys"],
+        }
+    )
+    table = pa.Table.from_pylist(
+        [
+            _record("2024-01-01 00:00:02 +00:00", "c"),
+            _record("2024-01-01 00:00:00 +00:00", "a"),
+            _record("2024-01-01 00:00:01 +00:00", "b"),
+            _record("2024-01-01 00:00:00 +00:00", "b"),
+            _record("2024-01-01 00:00:02 +00:00", "c"),
+        ]
+    )
+
+    assert boundary_keys.filter_table(table).column("messageId").to_pylist() == [
+        "c",
+        "b",
+        "b",
+    ]
+    assert boundary_keys.to_state() == _boundary_keys_state(
+        "2024-01-01 00:00:02 +00:00", "c"
+    )
+
+
+def _boundary_keys_state(created_at: str, message_id: str) -> dict:
+    boundary_keys = _boundary_keys()
+    boundary_keys.is_duplicate(_record(created_at, message_id))
+
+    return boundary_keys.to_state()
@@ -0,0 +1,75 @@
+"""Tests parallel decoding of export files."""
+
+from __future__ import annotations
+
+import decimal
+import typing as t
+
+import pytest
+
+from tap_iterable import parallel, spool, stats, transformers
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture(scope="module")
+def decode_pool():
+    decode_pool = parallel.DecodePool(
+        workers=2,
+        chunk_size=100,
+        decoder_backend="json",
+        exact_numbers=True,
+        transformer=transformers.decode_json_strings(["data"]),
+    )
+
+    yield decode_pool
+
+    decode_pool.close()
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_read(
+    decode_pool: parallel.DecodePool,
+    tmp_path: Path,
+    compression: str,
+    trailing_newline: bool,  # noqa: FBT001
+):
+    lines = [
+        f'{{"id": {i}, "value": {i}.5, "data": "{{\\"i\\": {i}}}"}}\n'.encode()
+        for i in range(100)
+    ]
+    content = b"".join(lines) if trailing_newline else b"".join(lines)[:-1]
+
+    filepath = tmp_path / "export.jsonl"
+
+    with spool.open_writer(filepath, compression) as f:
+        f.write(content)
+
+    window_stats = stats.SyncStats()
+    chunks = list(decode_pool.read(filepath, window_stats))
+
+    # records are returned in order, in chunks split at record boundaries
+    assert len(chunks) > 1
+    records = [r for records, _ in chunks for r in records]
+    assert records == [
+        {"id": i, "value": decimal.Decimal(f"{i}.5"), "data": {"i": i}}
+        for i in range(100)
+    ]
+    assert window_stats.records_decoded == 100
+
+    ends = [end for _, chunk_ends in chunks for end in chunk_ends]
+    assert ends[-1] == len(content)
+
+    # reading from the end of a record resumes with the next record
+    offset = ends[49]
+    resumed = decode_pool.read(filepath, window_stats, offset)
+    assert [r["id"] for records, _ in resumed for r in records] == list(range(50, 100))
+
+
+def test_read_empty(decode_pool: parallel.DecodePool, tmp_path: Path):
+    filepath = tmp_path / "export.jsonl"
+    filepath.touch()
+
+    assert not list(decode_pool.read(filepath, stats.SyncStats()))
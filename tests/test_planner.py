@@ -0,0 +1,130 @@
+"""Tests planning of the requests needed to sync the selected streams."""
+
+from __future__ import annotations
+
+import typing as t
+
+import pytest
+
+from tap_iterable import planner
+from tap_iterable.tap import TapIterable
+from tests.test_streams import BASE_CONFIG
+from tests.test_tap import _catalog
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fake_iterable import FakeIterable
+
+CONFIG = {
+    **BASE_CONFIG,
+    "start_date": "2024-01-01T00:00:00Z",
+    "end_date": "2024-01-02T00:00:00Z",
+    "export_window_hours": 6,
+}
+
+
+@pytest.mark.parametrize(
+    ("selected", "expected"),
+    [
+        pytest.param(
+            ["email_templates", "users"],
+            {
+                "templates": "1 request",
+                "email_templates": "1 request per record of 'templates'",
+                "users": "4 requests",
+            },
+            id="email_templates",
+        ),
+        pytest.param(
+            ["templates"],
+            {"templates": "4 requests"},
+            id="templates",
+        ),
+        pytest.param(
+            ["metadata"],
+            {
+                "_metadata": "1 request",
+                "_metadata_tables": "1 request per record of '_metadata'",
+                "metadata": "1 request per record of '_metadata_tables'",
+            },
+            id="metadata",
+        ),
+    ],
+)
+def test_plan_requests(selected: list[str], expected: dict[str, str]):
+    catalog = _catalog(TapIterable(config=CONFIG), selected)
+    tap = TapIterable(config=CONFIG, catalog=catalog)
+
+    estimates = planner.plan_requests(tap.streams.values())
+
+    assert {name: str(e) for name, e in estimates.items()} == expected
+
+
+def test_plan_export_jobs():
+    config = {**CONFIG, "export_engine": "job"}
+    catalog = _catalog(TapIterable(config=config), ["users"])
+    tap = TapIterable(config=config, catalog=catalog)
+
+    estimates = planner.plan_requests(tap.streams.values())
+
+    assert estimates["users"].requests == 3 * 4
+
+
+def test_plan_export_without_start():
+    config = {k: v for k, v in CONFIG.items() if k != "start_date"}
+    catalog = _catalog(TapIterable(config=config), ["users"])
+    tap = TapIterable(config=config, catalog=catalog)
+
+    estimates = planner.plan_requests(tap.streams.values())
+
+    # the earliest window with records is found by halving the windows since 2013
+    # (16072 six-hour windows) until one is left, then at least one window is
+    # requested
+    assert estimates["users"].requests == 1 + 14 + 1
+
+
+def test_dry_run(iterable: FakeIterable, capsys: pytest.CaptureFixture):
+    config = {**CONFIG, "dry_run": True}
+    catalog = _catalog(TapIterable(config=config), ["email_templates", "users"])
+    capsys.readouterr()
+
+    tap = TapIterable(config=config, catalog=catalog)
+
+    tap.sync_all()
+    output = capsys.readouterr()
+
+    assert not iterable.requests
+    assert not output.out
+    assert not any(tap.state.get("bookmarks", {}).values())
+    assert "Planned requests for 'users': 4 requests" in output.err
+
+
+@pytest.mark.parametrize("batch_format", ["jsonl", "parquet"])
+def test_dry_run_batches(
+    iterable: FakeIterable,
+    capsys: pytest.CaptureFixture,
+    tmp_path: Path,
+    batch_format: str,
+):
+    if batch_format == "parquet":
+        pytest.importorskip("pyarrow")
+
+    config = {
+        **CONFIG,
+        "dry_run": True,
+        "batch_config": {
+            "encoding": {"format": batch_format, "compression": "gzip"},
+            "storage": {"root": f"file://{tmp_path}"},
+        },
+    }
+    catalog = _catalog(TapIterable(config=config), ["email_send"])
+    capsys.readouterr()
+
+    TapIterable(config=config, catalog=catalog).sync_all()
+    output = capsys.readouterr()
+
+    assert not iterable.requests
+    assert not output.out
+    assert not list(tmp_path.iterdir())
+    assert "Planned requests for 'email_send': 4 requests" in output.err
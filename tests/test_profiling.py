@@ -0,0 +1,48 @@
+"""Tests profiling of stream syncs."""
+
+from __future__ import annotations
+
+import logging
+import pstats
+import tracemalloc
+import typing as t
+
+from tap_iterable import profiling
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def _allocate() -> list[str]:
+    return [str(i) for i in range(10_000)]
+
+
+def test_profile(tmp_path: Path, caplog: pytest.LogCaptureFixture):
+    logger = logging.getLogger("tap-iterable")
+
+    with (
+        caplog.at_level(logging.INFO),
+        profiling.profile(
+            "users",
+            tmp_path,
+            logger=logger,
+            top=5,
+        ),
+    ):
+        retained = _allocate()
+
+    assert retained
+    assert not tracemalloc.is_tracing()
+
+    profile = pstats.Stats(str(tmp_path / "users.prof"))
+    assert any(name == "_allocate" for _, _, name in profile.stats)
+
+    snapshot = tracemalloc.Snapshot.load(str(tmp_path / "users.tracemalloc"))
+    assert snapshot.statistics("lineno")
+
+    peak_message, profile_message = caplog.messages
+    assert "Top 5 allocation sites" in peak_message
+    assert __file__ in peak_message
+    assert "Top 5 functions by own time" in profile_message
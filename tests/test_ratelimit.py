@@ -0,0 +1,91 @@
+"""Tests endpoint rate limiting."""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from tap_iterable.ratelimit import RateLimiter, TokenBucket, retry_after
+
+
+def test_token_bucket_spacing():
+    bucket = TokenBucket(50)  # 20 ms interval
+
+    start = time.monotonic()
+
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(lambda _: bucket.acquire(), range(8)))
+
+    assert time.monotonic() - start == pytest.approx(0.14, abs=0.05)
+
+
+def test_token_bucket_capacity():
+    bucket = TokenBucket(1, capacity=3)
+
+    assert [bucket.acquire() for _ in range(3)] == [0, 0, 0]
+
+
+def test_token_bucket_throttle():
+    bucket = TokenBucket(100)
+    bucket.throttle(0.1)
+
+    assert bucket.rate == 50
+    assert bucket.acquire() == pytest.approx(0.1, abs=0.02)
+
+    for _ in range(10):
+        bucket.recover()
+
+    assert bucket.rate == 100
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(
+        {
+            "/lists/getUsers": 5,
+            "/metadata/{table}/{key}": 60,
+            "/export/data.json": 0,
+        }
+    )
+
+    assert limiter.get("/lists/getUsers").rate == pytest.approx(5 / 60)
+    assert limiter.get("/metadata/a/b").rate == 1
+    assert limiter.get("/metadata/a") is None
+    assert limiter.get("/export/data.json") is None
+    assert limiter.get("/export/dataXjson") is None
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        pytest.param(None, None, id="missing"),
+        pytest.param("30", 30, id="seconds"),
+        pytest.param("Wed, 21 Oct 2015 07:28:00 GMT", 0, id="past-date"),
+        pytest.param("soon", None, id="invalid"),
+    ],
+)
+def test_retry_after(value: str | None, expected: float | None):
+    response = requests.Response()
+
+    if value:
+        response.headers["Retry-After"] = value
+
+    assert retry_after(response) == expected
+
+
+def test_token_bucket_close():
+    bucket = TokenBucket(1)
+    bucket.acquire()
+
+    with ThreadPoolExecutor(1) as executor:
+        waiting = executor.submit(bucket.acquire)
+        time.sleep(0.05)
+
+        start = time.monotonic()
+        bucket.close()
+        waiting.result()
+
+    # callers stop waiting as soon as the bucket is closed
+    assert time.monotonic() - start < 0.5
@@ -0,0 +1,117 @@
+"""Tests tracking of export progress for resumption."""
+
+from __future__ import annotations
+
+import pytest
+
+from tap_iterable import resume
+
+
+def _record(created_at: str | None, message_id: str | None = None) -> dict:
+    return {"createdAt": created_at, "messageId": message_id or created_at}
+
+
+def test_track():
+    progress = resume.ExportProgress("createdAt")
+    records = [
+        _record("2024-01-01 00:00:00 +00:00"),
+        _record(None),
+        _record("2024-01-01 00:00:01 +00:00"),
+        _record("2024-01-01 00:00:01 +00:00"),
+    ]
+
+    assert list(progress.track(records)) == records
+    assert progress.value == "2024-01-01 00:00:01 +00:00"
+    assert progress.ordered
+
+    list(progress.track([_record("2024-01-01 00:00:00 +00:00")]))
+
+    # an earlier record may have been preceded by any later record
+    assert progress.value == "2024-01-01 00:00:01 +00:00"
+    assert not progress.ordered
+
+
+def test_track_resume():
+    progress = resume.ExportProgress("createdAt", ("messageId",))
+    records = [
+        _record("2024-01-01 00:00:00 +00:00", "a"),
+        _record("2024-01-01 00:00:01 +00:00", "b"),
+        _record("2024-01-01 00:00:01 +00:00", "c"),
+    ]
+    list(progress.track(records))
+    progress.resume()
+
+    # records already emitted at the latest value are skipped once resumed
+    resumed = [
+        _record("2024-01-01 00:00:01 +00:00", "b"),
+        _record("2024-01-01 00:00:01 +00:00", "d"),
+        _record("2024-01-01 00:00:01 +00:00", "c"),
+        _record("2024-01-01 00:00:02 +00:00", "b"),
+    ]
+    assert list(progress.track(resumed)) == [resumed[1], resumed[3]]
+    assert progress.ordered
+
+
+def test_track_tables_resume():
+    pa = pytest.importorskip("pyarrow")
+
+    progress = resume.ExportProgress("createdAt", ("messageId",))
+    table = pa.Table.from_pylist(
+        [
+            _record("2024-01-01 00:00:00 +00:00", "a"),
+            _record("2024-01-01 00:00:01 +00:00", "b"),
+        ]
+    )
+    list(progress.track_tables([table]))
+    progress.resume()
+
+    table = pa.Table.from_pylist(
+        [
+            _record("2024-01-01 00:00:01 +00:00", "b"),
+            _record("2024-01-01 00:00:01 +00:00", "c"),
+        ]
+    )
+    (resumed,) = progress.track_tables([table])
+
+    assert resumed.column("messageId").to_pylist() == ["c"]
+    assert progress.ordered
+
+
+@pytest.mark.parametrize(
+    ("created_at", "ordered"),
+    [
+        pytest.param(["00:00:01", "00:00:02", None, "00:00:02"], True, id="ordered"),
+        pytest.param(["00:00:02", "00:00:01"], False, id="unordered"),
+        pytest.param(["00:00:00", "00:00:02"], False, id="earlier"),
+    ],
+)
+def test_track_tables(created_at: list[str | None], ordered: bool):  # noqa: FBT001
+    pa = pytest.importorskip("pyarrow")
+
+    progress = resume.ExportProgress("createdAt")
+    list(progress.track([_record("2024-01-01 00:00:01 +00:00")]))
+
+    table = pa.Table.from_pylist(
+        [_record(value and f"2024-01-01 {value} +00:00") for value in created_at]
+    )
+
+    assert list(progress.track_tables([table])) == [table]
+    assert progress.value == "2024-01-01 00:00:02 +00:00"
+    assert progress.ordered == ordered
+
+
+def test_track_resume_max_keys():
+    progress = resume.ExportProgress("createdAt", ("messageId",), max_keys=2)
+    records = [_record("2024-01-01 00:00:01 +00:00", k) for k in "abc"]
+    list(progress.track(records))
+
+    assert not progress.keys_complete
+    assert not progress._keys  # noqa: SLF001
+
+    progress.resume()
+
+    # no keys are kept beyond the maximum, so records at the value are emitted again
+    assert list(progress.track(records)) == records
+
+    list(progress.track([_record("2024-01-01 00:00:02 +00:00", "a")]))
+    assert progress.keys_complete
@@ -0,0 +1,52 @@
+"""Tests compressed spool files for downloaded exports."""
+
+from __future__ import annotations
+
+import importlib.util
+import typing as t
+
+import pytest
+
+from tap_iterable import spool
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+COMPRESSIONS = [
+    "none",
+    "gzip",
+    pytest.param(
+        "zstd",
+        marks=pytest.mark.skipif(
+            not importlib.util.find_spec("zstandard"),
+            reason="zstandard is not installed",
+        ),
+    ),
+]
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_round_trip(tmp_path: Path, compression: str):
+    lines = [f'{{"id": {i}}}\n'.encode() for i in range(1000)]
+    filepath = tmp_path / "spool.jsonl"
+
+    with spool.open_writer(filepath, compression) as f:
+        for line in lines:
+            f.write(line)
+
+    with spool.open_reader(filepath) as f:
+        assert list(f) == lines
+
+    offset = sum(map(len, lines[:500]))
+
+    with spool.open_reader(filepath) as f:
+        spool.skip(f, offset, chunk_size=100)
+        assert list(f) == lines[500:]
+
+    if compression != "none":
+        assert filepath.stat().st_size < offset
+
+
+def test_unsupported_compression(tmp_path: Path):
+    with pytest.raises(ValueError, match="Unsupported spool compression"):
+        spool.open_writer(tmp_path / "spool.jsonl", "lz4")
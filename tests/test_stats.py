@@ -0,0 +1,55 @@
+"""Tests sync performance statistics."""
+
+from __future__ import annotations
+
+import json
+import typing as t
+
+from tap_iterable import stats
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_merge():
+    window_stats = stats.SyncStats()
+    window_stats.add_download(2 * 1000**2, 4)
+    window_stats.add_spool(100, 0.25)
+    window_stats.add_emit(0.5)
+    list(map(window_stats.timed_decode(json.loads), ["{}", "[]"]))
+
+    stream_stats = stats.SyncStats()
+    stream_stats.add_spool(200)
+    stream_stats.add_retry()
+    stream_stats.merge(window_stats)
+    stream_stats.merge(window_stats)
+
+    values = stream_stats.values()
+    assert values[stats.Metric.BYTES_DOWNLOADED] == 4 * 1000**2
+    assert values[stats.Metric.DOWNLOAD_RATE] == 0.5
+    assert values[stats.Metric.RECORDS_DECODED] == 4
+    assert values[stats.Metric.RETRY_COUNT] == 1
+    assert values[stats.Metric.PEAK_SPOOL_SIZE] == 200
+    assert values[stats.Metric.SPOOL_WRITE_DURATION] == 0.5
+    assert values[stats.Metric.EMIT_DURATION] == 1
+    assert stats.Metric.DECODE_RATE in values
+
+
+def test_write_prometheus_textfile(tmp_path: Path):
+    email_send = stats.SyncStats()
+    email_send.add_download(1000, 0.5)
+    lists = stats.SyncStats()
+
+    filepath = tmp_path / "tap_iterable.prom"
+    stats.write_prometheus_textfile(
+        filepath,
+        {"email_send": email_send, "lists": lists},
+    )
+
+    lines = filepath.read_text().splitlines()
+    assert "# TYPE tap_iterable_http_bytes_downloaded gauge" in lines
+    assert 'tap_iterable_http_bytes_downloaded{stream="email_send"} 1000' in lines
+    assert 'tap_iterable_http_bytes_downloaded{stream="lists"} 0' in lines
+    assert 'tap_iterable_http_download_rate{stream="email_send"} 0.002' in lines
+    assert 'tap_iterable_http_download_rate{stream="lists"}' not in "\n".join(lines)
+    assert list(tmp_path.iterdir()) == [filepath]
@@ -0,0 +1,1110 @@
+"""Tests stream behaviour without making requests to the Iterable API."""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import random
+import time
+import typing as t
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from tap_iterable import streams
+from tap_iterable.tap import TapIterable
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fake_iterable import FakeIterable
+
+BASE_CONFIG = {
+    "api_key": "test",
+}
+
+
+def _export_response(request: requests.PreparedRequest):
+    params = parse_qs(urlparse(request.url).query)
+    (start_date,) = params["startDateTime"]
+
+    response = requests.Response()
+    response.status_code = 200
+    response.request = request
+    response.elapsed = timedelta()
+    response.raw = io.BytesIO(
+        json.dumps({"createdAt": start_date, "messageId": start_date}).encode()
+    )
+
+    return response
+
+
+@pytest.fixture
+def tap(request: pytest.FixtureRequest):
+    config = getattr(request, "param", {})
+    return TapIterable(config={**BASE_CONFIG, **config}, validate_config=False)
+
+
+@pytest.mark.parametrize(
+    "tap",
+    [
+        {
+            "start_date": "2024-01-01T00:00:00Z",
+            "end_date": "2024-01-03T12:00:00Z",
+            "export_window_hours": 24,
+        }
+    ],
+    indirect=True,
+)
+def test_export_windows(tap: TapIterable):
+    stream = tap.streams["email_send"]
+    stream._write_starting_replication_value(None)  # noqa: SLF001
+    windows = list(stream.get_export_windows(None))
+
+    assert windows == [
+        (
+            datetime(2024, 1, 1, tzinfo=timezone.utc),
+            datetime(2024, 1, 2, tzinfo=timezone.utc),
+        ),
+        (
+            datetime(2024, 1, 2, tzinfo=timezone.utc),
+            datetime(2024, 1, 3, tzinfo=timezone.utc),
+        ),
+        (
+            datetime(2024, 1, 3, tzinfo=timezone.utc),
+            datetime(2024, 1, 3, 12, tzinfo=timezone.utc),
+        ),
+    ]
+
+    params = stream.get_url_params(None, windows[-1])
+    assert params["startDateTime"] == "2024-01-03 00:00:00"
+    assert params["endDateTime"] == "2024-01-03 12:00:00"
+    assert "page" not in params
+
+
+def _deselect_properties(stream, names: t.Iterable[str]):
+    for name in names:
+        stream.metadata["properties", name].selected = False
+
+    stream._mask = None  # noqa: SLF001
+
+
+def test_export_field_projection(tap: TapIterable):
+    stream = tap.streams["email_send"]
+    _deselect_properties(stream, ["messageId", "campaignId", "templateId"])
+
+    # primary key is always exported
+    params = stream.get_url_params(None, (None, None))
+    assert params["omitFields"] == "campaignId,templateId"
+
+    params = tap.streams["email_open"].get_url_params(None, (None, None))
+    assert "omitFields" not in params
+
+
+def test_users_field_projection(tap: TapIterable):
+    stream = tap.streams["users"]
+    properties = set(stream.schema["properties"])
+    _deselect_properties(stream, properties - {"email", "signupDate"})
+
+    params = stream.get_url_params(None, (None, None))
+    assert "omitFields" not in params
+    assert set(params["onlyFields"].split(",")) == {
+        "email",
+        "signupDate",
+        "profileUpdatedAt",
+    }
+
+
+def test_schema_properties_per_class(tap: TapIterable):
+    stream = tap.streams["email_send"]
+    other = TapIterable(config=BASE_CONFIG, validate_config=False).streams["email_send"]
+
+    # derived from the schema once for every instance of the stream class
+    assert stream._date_time_properties == {"createdAt"}  # noqa: SLF001
+    assert other._date_time_properties is stream._date_time_properties  # noqa: SLF001
+    assert other.exact_numbers == stream.exact_numbers
+
+
+@pytest.mark.parametrize("export_engine", ["sync", "job"])
+def test_export_field_projection_requested(
+    iterable: FakeIterable,  # noqa: ARG001
+    monkeypatch: pytest.MonkeyPatch,
+    export_engine: str,
+):
+    config = {
+        **BASE_CONFIG,
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-01-02T00:00:00Z",
+        "export_engine": export_engine,
+    }
+    stream = TapIterable(config=config, validate_config=False).streams["email_send"]
+    monkeypatch.setattr(stream, "export_job_poll_interval", 0)
+    _deselect_properties(stream, ["campaignId", "templateId"])
+    stream._write_starting_replication_value(None)  # noqa: SLF001
+    records = list(stream.request_records(None))
+
+    # deselected properties are omitted by the API, for export requests and jobs
+    assert len(records) == 24
+    assert {k for r in records for k in r} == {
+        "createdAt",
+        "messageId",
+        "email",
+        "messageTypeId",
+        "transactionalData",
+    }
+
+
+def test_export_windows_without_start(tap: TapIterable):
+    stream = tap.streams["email_send"]
+    stream._write_starting_replication_value(None)  # noqa: SLF001
+    windows = list(stream.get_export_windows(None))
+
+    assert windows == [(None, None)]
+    assert stream.get_url_params(None, windows[0])["range"] == "All"
+
+
+@pytest.mark.parametrize(
+    "tap",
+    [{"end_date": "2024-01-02T00:00:00Z", "export_window_hours": 6}],
+    indirect=True,
+)
+@pytest.mark.parametrize(
+    "iterable",
+    [{"start_date": datetime(2024, 1, 1, 3, tzinfo=timezone.utc)}],
+    indirect=True,
+)
+def test_export_windows_from_earliest_record(
+    tap: TapIterable,
+    iterable: FakeIterable,
+):
+    stream = tap.streams["email_send"]
+    stream._write_starting_replication_value(None)  # noqa: SLF001
+    windows = list(stream.get_export_windows(None))
+
+    # windows start from the earliest window with records, rather than one window for
+    # all records
+    assert [start.hour for start, _ in windows] == [0, 6, 12, 18]
+    assert windows[0][0] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert windows[-1][1] == datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+    # `onlyFields` is only requested for user exports
+    requested = [parse_qs(urlparse(url).query) for _, url in iterable.requests]
+    assert not any("onlyFields" in q for q in requested)
+
+
+@pytest.mark.parametrize(
+    "tap",
+    [{"end_date": "2024-01-02T00:00:00Z", "export_window_hours": 6}],
+    indirect=True,
+)
+@pytest.mark.parametrize("iterable", [{"records_per_hour": 4}], indirect=True)
+def test_export_windows_from_earliest_unordered_record(
+    tap: TapIterable,
+    iterable: FakeIterable,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    export_records = iterable.export_records
+
+    # the earliest record is exported last
+    monkeypatch.setattr(
+        iterable,
+        "export_records",
+        lambda *args: reversed(list(export_records(*args))),
+    )
+
+    stream = tap.streams["users"]
+    stream._write_starting_replication_value(None)  # noqa: SLF001
+    windows = list(stream.get_export_windows(None))
+
+    assert windows[0][0] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert len(windows) == 4
+
+    requested = [parse_qs(urlparse(url).query) for _, url in iterable.requests]
+    assert len(requested) == stream.estimate_requests(None) - 1
+    assert all(q["onlyFields"] == ["profileUpdatedAt"] for q in requested)
+
+
+@pytest.mark.parametrize("iterable", [{"records_per_hour": 4}], indirect=True)
+def test_export_late_records(
+    iterable: FakeIterable,
+    capsys: pytest.CaptureFixture,
+):
+    now = datetime.now(tz=timezone.utc).replace(minute=0, second=0, microsecond=0)
+    iterable.start_date = now - timedelta(hours=21)
+
+    # records created in the last hour are only exported after the first sync
+    iterable.end_date = now - timedelta(hours=1)
+
+    config = {
+        **BASE_CONFIG,
+        "start_date": iterable.start_date.isoformat(),
+        "export_window_hours": 6,
+    }
+    tap = TapIterable(config=config, validate_config=False)
+    tap.streams["email_send"].sync()
+    tap.streams["email_send"].finalize_state_progress_markers()
+
+    iterable.end_date = now
+    tap = TapIterable(config=config, state=tap.state, validate_config=False)
+    tap.streams["email_send"].sync()
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    created_at = [m["record"]["createdAt"] for m in messages if m["type"] == "RECORD"]
+
+    assert created_at == [
+        f"{iterable.start_date + i * timedelta(minutes=15):%Y-%m-%d %H:%M:%S} +00:00"
+        for i in range(21 * 4)
+    ]
+
+
+@pytest.mark.parametrize(
+    "tap",
+    [
+        {
+            "start_date": "2024-01-01T00:00:00Z",
+            "end_date": "2024-01-11T00:00:00Z",
+            "export_window_hours": 24,
+            "max_parallel_downloads": 4,
+        }
+    ],
+    indirect=True,
+)
+def test_export_windows_concurrently(
+    tap: TapIterable,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    def send(_, request, **__):
+        time.sleep(random.random() / 100)  # noqa: S311
+        return _export_response(request)
+
+    monkeypatch.setattr(requests.Session, "send", send)
+
+    stream = tap.streams["email_send"]
+    stream._write_starting_replication_value(None)  # noqa: SLF001
+    records = list(stream.request_records(None))
+
+    assert [r["messageId"] for r in records] == [
+        f"2024-01-{day:02} 00:00:00" for day in range(1, 11)
+    ]
+    assert stream.stream_state["replication_key_value"] == "2024-01-11T00:00:00+00:00"
+
+
+@pytest.mark.parametrize("iterable", [{"records_per_hour": 10}], indirect=True)
+@pytest.mark.parametrize(
+    ("config", "warnings", "bookmark"),
+    [
+        pytest.param(
+            {"end_date": "2024-01-02T00:00:00Z", "export_window_hours": 1},
+            0,
+            "2024-01-02T00:00:00+00:00",
+            id="windows",
+        ),
+        pytest.param({}, 1, "2024-01-01 23:54:00 +00:00", id="unbounded"),
+    ],
+)
+def test_export_state_progress(
+    iterable: FakeIterable,  # noqa: ARG001
+    capsys: pytest.CaptureFixture,
+    config: dict,
+    warnings: int,
+    bookmark: str,
+):
+    tap = TapIterable(
+        config={**BASE_CONFIG, "start_date": "2024-01-01T00:00:00Z", **config},
+        validate_config=False,
+    )
+    stream = tap.streams["email_send"]
+    stream.sync()
+
+    # records of bounded windows are not tracked as unsorted, as the bookmark is
+    # advanced to the end of each window instead
+    assert capsys.readouterr().err.count("Stream is assumed to be unsorted") == warnings
+    assert "progress_markers" not in stream.stream_state
+    assert stream.stream_state["replication_key_value"] == bookmark
+
+
+@pytest.mark.parametrize(
+    "tap",
+    [
+        {
+            "start_date": "2024-01-01T00:00:00Z",
+            "end_date": "2024-01-02T00:00:00Z",
+            "export_window_hours": 12,
+            "export_engine": "job",
+            "max_parallel_downloads": 2,
+        }
+    ],
+    indirect=True,
+)
+def test_export_jobs(
+    tap: TapIterable,
+    iterable: FakeIterable,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    stream = tap.streams["email_send"]
+    monkeypatch.setattr(stream, "export_job_poll_interval", 0)
+    stream._write_starting_replication_value(None)  # noqa: SLF001
+    records = list(stream.request_records(None))
+
+    assert [r["createdAt"] for r in records] == [
+        f"2024-01-01 {hour:02}:00:00 +00:00" for hour in range(24)
+    ]
+    assert len(iterable.jobs) == 2
+    assert stream.stream_state["replication_key_value"] == "2024-01-02T00:00:00+00:00"
+
+
+@pytest.mark.parametrize(
+    "tap",
+    [
+        {
+            "start_date": "2024-01-01T00:00:00Z",
+            "end_date": "2024-01-02T00:00:00Z",
+            "export_window_hours": 6,
+            "export_engine": "job",
+            "max_parallel_downloads": 2,
+        }
+    ],
+    indirect=True,
+)
+def test_export_jobs_prefetch(
+    tap: TapIterable,
+    iterable: FakeIterable,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    stream = tap.streams["email_send"]
+    monkeypatch.setattr(stream, "export_job_poll_interval", 0)
+
+    # jobs are started for the first windows ahead of the stream being synced
+    stream.prefetch_sync()
+    jobs = stream._prefetched[()]  # noqa: SLF001
+    assert len(jobs.pending) == 2
+
+    for _, future in jobs.pending:
+        future.result()
+
+    assert len(iterable.jobs) == 2
+    assert not any("/files/" in url for _, url in iterable.requests)
+
+    stream._write_starting_replication_value(None)  # noqa: SLF001
+    records = list(stream.request_records(None))
+
+    assert [r["createdAt"] for r in records] == [
+        f"2024-01-01 {hour:02}:00:00 +00:00" for hour in range(24)
+    ]
+    assert len(iterable.jobs) == 4
+    assert jobs.executor._shutdown  # noqa: SLF001
+
+
+@pytest.mark.parametrize(
+    "tap",
+    [
+        {
+            "start_date": "2024-01-01T00:00:00Z",
+            "end_date": "2024-01-02T00:00:00Z",
+            "export_window_hours": 3,
+            "max_parallel_downloads": 2,
+        }
+    ],
+    indirect=True,
+)
+def test_export_prefetch(tap: TapIterable, iterable: FakeIterable):
+    stream = tap.streams["email_send"]
+
+    # only the first windows are downloaded ahead of the stream being synced, so
+    # disk use is bounded
+    stream.prefetch_sync()
+    downloads = stream._prefetched[()]  # noqa: SLF001
+    assert len(downloads.pending) == 2
+
+    for *_, future in downloads.pending:
+        future.result()
+
+    assert len(iterable.requests) == 2
+
+    stream._write_starting_replication_value(None)  # noqa: SLF001
+    records = list(stream.request_records(None))
+
+    assert len(records) == 24
+    assert len(iterable.requests) == 8
+
+
+@pytest.mark.parametrize(
+    ("name", "prefetched"),
+    [
+        pytest.param("campaigns", True, id="campaigns"),
+        pytest.param("templates", False, id="templates"),
+    ],
+)
+def test_prefetch_sync_incremental(
+    tap: TapIterable,
+    iterable: FakeIterable,
+    name: str,
+    *,
+    prefetched: bool,
+):
+    stream = tap.streams[name]
+    stream.prefetch_sync()
+
+    # records are requested ahead unless requests are filtered by the bookmark,
+    # which is only known once the stream is synced
+    if prefetched:
+        assert len(stream._prefetched[()].result()) == iterable.campaigns  # noqa: SLF001
+    else:
+        assert not stream._prefetched  # noqa: SLF001
+
+
+@pytest.mark.parametrize("tap", [{"max_parallel_requests": 3}], indirect=True)
+@pytest.mark.parametrize(
+    "iterable",
+    [{"lists": 10, "list_users": 3, "latency": 0.01}],
+    indirect=True,
+)
+def test_list_users(
+    tap: TapIterable,
+    iterable: FakeIterable,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    stream = tap.streams["list_users"]
+    records = []
+    requested = []
+
+    def write_record_message(record):
+        records.append(record)
+        requested.append(len(stream._queued_contexts) + len(stream._prefetched))  # noqa: SLF001
+
+    monkeypatch.setattr(stream, "_write_record_message", write_record_message)
+    tap.streams["lists"].sync()
+
+    assert records == [
+        {"email": f"user{i}@list{list_id}.example.com", "listId": list_id}
+        for list_id in range(1, 11)
+        for i in range(3)
+    ]
+    assert len(iterable.requests) == 11
+
+    # list users are only requested for as many lists ahead as are requested
+    # concurrently
+    assert max(requested) == 3
+
+    # threads requesting list users are kept until the sync ends, once every
+    # stream has logged its sync costs
+    assert "_executor" in stream.__dict__
+    stream.log_sync_costs()
+    assert "_executor" in stream.__dict__
+
+    for s in tap.streams.values():
+        s.log_sync_costs()
+
+    assert "_executor" not in stream.__dict__
+
+
+@pytest.mark.parametrize("iterable", [{"lists": 3, "list_users": 3}], indirect=True)
+def test_list_users_serial(
+    tap: TapIterable,
+    iterable: FakeIterable,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    stream = tap.streams["list_users"]
+    records = []
+    monkeypatch.setattr(stream, "_write_record_message", records.append)
+    tap.streams["lists"].sync()
+
+    assert records == [
+        {"email": f"user{i}@list{list_id}.example.com", "listId": list_id}
+        for list_id in range(1, 4)
+        for i in range(3)
+    ]
+    assert len(iterable.requests) == 4
+
+    # list users are requested directly, not in threads
+    assert "_executor" not in stream.__dict__
+
+
+@pytest.mark.parametrize("tap", [{"max_parallel_requests": 4}], indirect=True)
+@pytest.mark.parametrize(
+    "iterable",
+    [{"metadata_tables": 3, "metadata_keys": 4, "latency": 0.01}],
+    indirect=True,
+)
+def test_metadata(
+    tap: TapIterable,
+    iterable: FakeIterable,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    records = []
+    monkeypatch.setattr(
+        tap.streams["metadata"],
+        "_write_record_message",
+        records.append,
+    )
+    tap.streams["_metadata"].sync()
+
+    assert [(r["table"], r["key"]) for r in records] == [
+        (f"table{i}", f"table{i}-key{j}") for i in range(3) for j in range(4)
+    ]
+    assert len(iterable.requests) == 1 + 3 + 3 * 4
+
+
+def test_email_template_cache(
+    iterable: FakeIterable,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+):
+    def sync():
+        tap = TapIterable(
+            config={**BASE_CONFIG, "email_template_cache_dir": str(tmp_path)},
+            validate_config=False,
+        )
+        stream = tap.streams["email_templates"]
+        records = []
+        monkeypatch.setattr(stream, "_write_record_message", records.append)
+
+        iterable.requests.clear()
+        tap.streams["_message_mediums"].sync()
+
+        requested = [
+            int(parse_qs(urlparse(url).query)["templateId"][0])
+            for _, url in iterable.requests
+            if urlparse(url).path.endswith("/templates/email/get")
+        ]
+
+        return {r["templateId"]: r["html"] for r in records}, requested
+
+    records, requested = sync()
+    assert requested == [1, 2, 3]
+
+    iterable.template_updates[2] = 1
+    cached_records, requested = sync()
+
+    assert requested == [2]
+    assert cached_records == {**records, 2: cached_records[2]}
+    assert cached_records[2] != records[2]
+
+
+@pytest.mark.parametrize("iterable", [{"records_per_hour": 10}], indirect=True)
+@pytest.mark.parametrize("export_decode_workers", [1, 2])
+def test_post_process_override(
+    iterable: FakeIterable,  # noqa: ARG001
+    tmp_path: Path,
+    export_decode_workers: int,
+):
+    class EvenEmailSendStream(streams.EmailSendStream):
+        def post_process(self, row, context=None):
+            row = super().post_process(row, context)
+
+            if row["transactionalData"]["index"] % 2:
+                return None
+
+            return {**row, "context": context}
+
+    tap = TapIterable(
+        config={
+            **BASE_CONFIG,
+            "start_date": "2024-01-01T00:00:00Z",
+            "export_decode_workers": export_decode_workers,
+            "temp_dir": str(tmp_path),
+        },
+        validate_config=False,
+    )
+    stream = EvenEmailSendStream(tap)
+    stream._write_starting_replication_value(None)  # noqa: SLF001
+
+    records = list(stream.get_records(None))
+
+    # records are transformed before being post-processed, and dropped if `None`
+    assert [r["messageId"] for r in records] == [
+        f"emailSend-{i}" for i in range(0, 24 * 10, 2)
+    ]
+    assert records[0]["transactionalData"] == {"index": 0}
+    assert records[0]["context"] is None
+
+
+@pytest.mark.parametrize("iterable", [{"records_per_hour": 10}], indirect=True)
+@pytest.mark.parametrize("max_parallel_downloads", [1, 2])
+@pytest.mark.parametrize("spool_compression", ["none", "gzip"])
+def test_export_spool(
+    iterable: FakeIterable,
+    tmp_path: Path,
+    max_parallel_downloads: int,
+    spool_compression: str,
+):
+    config = {
+        **BASE_CONFIG,
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-01-02T00:00:00Z",
+        "export_window_hours": 12,
+        "export_spool_dir": str(tmp_path),
+        "spool_compression": spool_compression,
+        "max_parallel_downloads": max_parallel_downloads,
+    }
+
+    def request_records(state: dict | None = None):
+        tap = TapIterable(config=config, state=state, validate_config=False)
+        stream = tap.streams["email_send"]
+        stream._write_starting_replication_value(None)  # noqa: SLF001
+
+        return tap, stream.request_records(None)
+
+    # interrupt the sync part way through the second window
+    tap, records = request_records()
+    interrupted = [next(records)["messageId"] for _ in range(150)]
+    records.close()
+
+    assert len(iterable.requests) == 2
+    state = tap.state
+
+    _, records = request_records(state)
+    resumed = [r["messageId"] for r in records]
+
+    # no new requests are made for the spooled window, and the spool file is resumed
+    # after the last record emitted before being interrupted
+    assert len(iterable.requests) == 2
+    assert interrupted + resumed == [f"emailSend-{i}" for i in range(24 * 10)]
+    assert not list(tmp_path.glob("*/*"))
+
+
+def test_export_spool_filepath(tap: TapIterable, tmp_path: Path):
+    window = (datetime(2024, 1, 1, tzinfo=timezone.utc), None)
+    stream = tap.streams["email_send"]
+    filepath = stream._get_spool_filepath(tmp_path, None, window)  # noqa: SLF001
+
+    # named by the export window and parameters, so is the same for every sync
+    other = TapIterable(config=BASE_CONFIG, validate_config=False).streams["email_send"]
+    assert other._get_spool_filepath(tmp_path, None, window) == filepath  # noqa: SLF001
+    assert filepath.name.startswith("email_send-latest-")
+
+    other = TapIterable(config=BASE_CONFIG, validate_config=False).streams["email_send"]
+    _deselect_properties(other, ["campaignId"])
+    assert other._get_spool_filepath(tmp_path, None, window) != filepath  # noqa: SLF001
+
+
+@pytest.mark.parametrize("iterable", [{"records_per_hour": 10}], indirect=True)
+def test_stream_exports_not_spooled(
+    iterable: FakeIterable,  # noqa: ARG001
+    tmp_path: Path,
+):
+    config = {
+        **BASE_CONFIG,
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-01-02T00:00:00Z",
+        "export_spool_dir": str(tmp_path),
+        "stream_exports": True,
+    }
+    stream = TapIterable(config=config, validate_config=False).streams["email_send"]
+    stream._write_starting_replication_value(None)  # noqa: SLF001
+    records = stream.request_records(None)
+
+    # streamed exports take precedence over the spool directory
+    assert next(records)["messageId"] == "emailSend-0"
+    assert not list(tmp_path.glob("*/*"))
+    assert len([next(records), *records]) == 24 * 10 - 1
+
+
+@pytest.mark.parametrize("iterable", [{"records_per_hour": 10}], indirect=True)
+@pytest.mark.parametrize("spool_compression", ["none", "gzip"])
+def test_export_decode_workers(
+    iterable: FakeIterable,  # noqa: ARG001
+    tmp_path: Path,
+    spool_compression: str,
+):
+    config = {
+        **BASE_CONFIG,
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-01-02T00:00:00Z",
+        "export_window_hours": 12,
+        "export_spool_dir": str(tmp_path),
+        "spool_compression": spool_compression,
+        "export_decode_workers": 2,
+    }
+
+    def get_records(state: dict | None = None):
+        tap = TapIterable(config=config, state=state, validate_config=False)
+        stream = tap.streams["email_send"]
+        stream._write_starting_replication_value(None)  # noqa: SLF001
+
+        return tap, stream, stream.get_records(None)
+
+    # interrupt the sync part way through the second window
+    tap, stream, records = get_records()
+    interrupted = [next(records) for _ in range(150)]
+    records.close()
+
+    # worker processes are shut down when records are no longer requested
+    assert stream.decode_pool._executor is None  # noqa: SLF001
+
+    _, stream, records = get_records(tap.state)
+    resumed = list(records)
+
+    # records are transformed once, and the spool file is resumed after the last
+    # record emitted before being interrupted
+    assert interrupted[0]["transactionalData"] == {"index": 0}
+    assert [r["messageId"] for r in interrupted + resumed] == [
+        f"emailSend-{i}" for i in range(24 * 10)
+    ]
+    assert stream.sync_stats.records_decoded == len(resumed)
+
+
+@pytest.mark.parametrize(
+    "iterable",
+    [{"records_per_hour": 10, "inclusive_end": True}],
+    indirect=True,
+)
+@pytest.mark.parametrize(("max_keys", "duplicates"), [(1000, 0), (0, 3)])
+def test_export_dedupe(
+    iterable: FakeIterable,  # noqa: ARG001
+    max_keys: int,
+    duplicates: int,
+):
+    config = {
+        **BASE_CONFIG,
+        "start_date": "2024-01-01T00:00:00Z",
+        "export_window_hours": 6,
+        "export_dedupe_max_keys": max_keys,
+    }
+
+    def sync(end_date: str, state: dict | None = None):
+        tap = TapIterable(
+            config={**config, "end_date": end_date},
+            state=state,
+            validate_config=False,
+        )
+        stream = tap.streams["email_send"]
+        stream._write_starting_replication_value(None)  # noqa: SLF001
+
+        return tap.state, [r["messageId"] for r in stream.request_records(None)]
+
+    # records at each window end are exported again by the next window or sync
+    state, records = sync("2024-01-01T12:00:00Z")
+    _, next_records = sync("2024-01-02T00:00:00Z", state)
+
+    records += next_records
+    assert len(records) - len(set(records)) == duplicates
+    assert set(records) == {f"emailSend-{i}" for i in range(24 * 10)}
+
+
+@pytest.mark.parametrize(
+    ("iterable", "persisted"),
+    [
+        pytest.param({"records_per_hour": 10, "inclusive_end": True}, True, id="end"),
+        pytest.param({"records_per_hour": 10}, False, id="before-end"),
+    ],
+    indirect=["iterable"],
+)
+def test_export_dedupe_state(
+    iterable: FakeIterable,  # noqa: ARG001
+    *,
+    persisted: bool,
+):
+    tap = TapIterable(
+        config={
+            **BASE_CONFIG,
+            "start_date": "2024-01-01T00:00:00Z",
+            "end_date": "2024-01-01T12:00:00Z",
+            "export_window_hours": 6,
+        },
+        validate_config=False,
+    )
+    stream = tap.streams["email_send"]
+    stream._write_starting_replication_value(None)  # noqa: SLF001
+    list(stream.request_records(None))
+
+    # keys are only persisted for records at the window end, which are exported
+    # again by the next sync
+    state = stream.get_context_state(None)
+
+    if persisted:
+        assert state["boundary_keys"]["value"] == "2024-01-01 12:00:00 +00:00"
+    else:
+        assert "boundary_keys" not in state
+
+
+@pytest.mark.parametrize(
+    "iterable",
+    [{"records_per_hour": 1000, "connection_resets": 1}],
+    indirect=True,
+)
+@pytest.mark.parametrize(
+    "config",
+    [
+        pytest.param({}, id="file"),
+        pytest.param({"stream_exports": True}, id="streamed"),
+        pytest.param({"export_spool_dir": "spool"}, id="spool"),
+        pytest.param(
+            {"export_window_hours": 12, "max_parallel_downloads": 2},
+            id="concurrent",
+        ),
+        pytest.param({"export_dedupe_max_keys": 0}, id="no-dedupe"),
+    ],
+)
+def test_export_resume(
+    iterable: FakeIterable,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    config: dict,
+):
+    monkeypatch.chdir(tmp_path)
+    tap = TapIterable(
+        config={
+            **BASE_CONFIG,
+            "start_date": "2024-01-01T00:00:00Z",
+            "end_date": "2024-01-02T00:00:00Z",
+            **config,
+        },
+        validate_config=False,
+    )
+    stream = tap.streams["email_send"]
+    stream._write_starting_replication_value(None)  # noqa: SLF001
+
+    records = [r["messageId"] for r in stream.request_records(None)]
+
+    # the export is resumed from the last record emitted, without duplicates
+    assert records == [f"emailSend-{i}" for i in range(24 * 1000)]
+
+    # the window is requested again from the last record emitted, rather than from
+    # the start of the window
+    start_dates = [
+        parse_qs(urlparse(url).query)["startDateTime"][0]
+        for _, url in iterable.requests
+    ]
+    resumed = [d for d in start_dates if not d.endswith(("00:00:00", "12:00:00"))]
+    assert len(resumed) == 1
+    assert stream.sync_stats.retry_count == 1
+
+
+@pytest.mark.parametrize(
+    "iterable",
+    [{"records_per_hour": 10, "connection_resets": 10}],
+    indirect=True,
+)
+def test_export_resume_attempts(iterable: FakeIterable):
+    tap = TapIterable(
+        config={**BASE_CONFIG, "start_date": "2024-01-01T00:00:00Z"},
+        validate_config=False,
+    )
+    stream = tap.streams["email_send"]
+    stream._write_starting_replication_value(None)  # noqa: SLF001
+
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        list(stream.request_records(None))
+
+    # resumed until no newer records are received after `export_resume_attempts`
+    assert stream.sync_stats.retry_count == stream.export_resume_attempts
+    assert iterable.connection_resets == 10 - stream.export_resume_attempts - 1
+
+
+@pytest.mark.parametrize("iterable", [{"records_per_hour": 10}], indirect=True)
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+def test_export_batches(
+    iterable: FakeIterable,  # noqa: ARG001
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture,
+    compression: str,
+):
+    config = {
+        **BASE_CONFIG,
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-01-02T00:00:00Z",
+        "export_window_hours": 12,
+        "batch_config": {
+            "encoding": {"format": "jsonl", "compression": compression},
+            "storage": {"root": f"file://{tmp_path}"},
+            "batch_size": 50,
+        },
+    }
+    tap = TapIterable(config=config, validate_config=False)
+    tap.streams["email_send"].sync()
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert not [m for m in messages if m["type"] == "RECORD"]
+
+    # batches end with each export window, followed by the state for the window (and
+    # the bookmark is not advanced within a window)
+    events = []
+    for message in messages:
+        if message["type"] == "BATCH":
+            (url,) = message["manifest"]
+            filepath = tmp_path / urlparse(url).path.rsplit("/", 1)[-1]
+            content = filepath.read_bytes()
+
+            if compression == "gzip":
+                content = gzip.decompress(content)
+
+            events.append(len(content.splitlines()))
+        elif message["type"] == "STATE":
+            bookmark = message["value"]["bookmarks"]["email_send"]
+
+            if value := bookmark.get("replication_key_value"):
+                events.append(value)
+
+    assert events == [
+        50,
+        50,
+        20,
+        "2024-01-01T12:00:00+00:00",
+        50,
+        50,
+        20,
+        "2024-01-02T00:00:00+00:00",
+    ]
+
+
+@pytest.mark.parametrize("iterable", [{"records_per_hour": 10}], indirect=True)
+def test_export_batches_bookmark(iterable: FakeIterable, tmp_path: Path):  # noqa: ARG001
+    config = {
+        **BASE_CONFIG,
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-01-02T00:00:00Z",
+        "export_window_hours": 12,
+        "batch_config": {
+            "encoding": {"format": "jsonl"},
+            "storage": {"root": f"file://{tmp_path}"},
+            "batch_size": 50,
+        },
+    }
+    tap = TapIterable(config=config, validate_config=False)
+    stream = tap.streams["email_send"]
+
+    # the bookmark for a window is only advanced with its last batch
+    bookmarks = [
+        stream.stream_state.get("replication_key_value")
+        for _ in stream.get_batches(stream.get_batch_config(config))
+    ]
+
+    assert bookmarks == [None] * 2 + ["2024-01-01T12:00:00+00:00"] * 3 + [
+        "2024-01-02T00:00:00+00:00"
+    ]
+    assert stream.stream_state["replication_key_value"] == "2024-01-02T00:00:00+00:00"
+
+
+@pytest.mark.parametrize("iterable", [{"records_per_hour": 10}], indirect=True)
+@pytest.mark.parametrize(
+    ("stream_name", "config"),
+    [
+        pytest.param("email_send", {}, id="columnar"),
+        pytest.param("email_send", {"stream_exports": True}, id="columnar-streamed"),
+        pytest.param("users", {}, id="records"),
+    ],
+)
+def test_export_parquet_batches(
+    iterable: FakeIterable,  # noqa: ARG001
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture,
+    stream_name: str,
+    config: dict,
+):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    config = {
+        **BASE_CONFIG,
+        **config,
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-01-02T00:00:00Z",
+        "export_window_hours": 12,
+        "batch_config": {
+            "encoding": {"format": "parquet", "compression": "gzip"},
+            "storage": {"root": f"file://{tmp_path}"},
+            "batch_size": 50,
+        },
+    }
+    tap = TapIterable(config=config, validate_config=False)
+    tap.streams[stream_name].sync()
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert not [m for m in messages if m["type"] == "RECORD"]
+
+    # batch sizes and bookmarks, in the order emitted
+    events = []
+    records = []
+    for message in messages:
+        if message["type"] == "BATCH":
+            (url,) = message["manifest"]
+            table = pq.read_table(tmp_path / urlparse(url).path.rsplit("/", 1)[-1])
+
+            events.append(table.num_rows)
+            records.extend(table.to_pylist())
+        elif message["type"] == "STATE":
+            bookmark = message["value"]["bookmarks"][stream_name]
+
+            if (value := bookmark.get("replication_key_value")) and (
+                value not in events
+            ):
+                events.append(value)
+
+    assert events == [
+        50,
+        50,
+        20,
+        "2024-01-01T12:00:00+00:00",
+        50,
+        50,
+        20,
+        "2024-01-02T00:00:00+00:00",
+    ]
+
+    if stream_name == "email_send":
+        assert records[1]["messageId"] == "emailSend-1"
+        assert records[1]["transactionalData"]["index"] == 1
+    else:
+        assert records[1]["dataFields"] == {"favouriteColour": "blue"}
+
+
+@pytest.mark.parametrize("iterable", [{"records_per_hour": 10}], indirect=True)
+@pytest.mark.parametrize(
+    "config",
+    [
+        pytest.param(
+            {"end_date": "2024-01-02T00:00:00Z", "export_window_hours": 12},
+            id="windows",
+        ),
+        pytest.param({}, id="unbounded"),
+    ],
+)
+def test_export_parquet_batches_sdk_parity(
+    iterable: FakeIterable,  # noqa: ARG001
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    config: dict,
+):
+    pytest.importorskip("pyarrow")
+
+    # records decoded into tables are synced by replicating `Stream._sync_records`
+    # (see `_sync_tables`), so must write the same messages as the SDK does for
+    # records (e.g. if the SDK is upgraded)
+    def sync(*, columnar_decoding: bool) -> list[dict]:
+        tap = TapIterable(
+            config={
+                **BASE_CONFIG,
+                **config,
+                "start_date": "2024-01-01T00:00:00Z",
+                "batch_config": {
+                    "encoding": {"format": "parquet"},
+                    "storage": {"root": f"file://{tmp_path}"},
+                    "batch_size": 50,
+                },
+            },
+            validate_config=False,
+        )
+        stream = tap.streams["email_send"]
+        monkeypatch.setattr(stream, "columnar_decoding", columnar_decoding)
+        capsys.readouterr()
+        stream.sync()
+
+        events = []
+
+        for line in capsys.readouterr().out.splitlines():
+            message = json.loads(line)
+
+            if message["type"] == "BATCH":
+                events.append(len(message["manifest"]))
+            elif message["type"] == "STATE":
+                # the signpost is the time of the sync
+                bookmark = message["value"]["bookmarks"]["email_send"]
+                events.append({**bookmark, "replication_key_signpost": None})
+
+        return events
+
+    assert sync(columnar_decoding=True) == sync(columnar_decoding=False)
@@ -0,0 +1,429 @@
+"""Tests tap behaviour without making requests to the Iterable API."""
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+import typing as t
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from singer_sdk import metrics
+
+from tap_iterable import stats
+from tap_iterable.tap import TapIterable
+from tests.test_streams import BASE_CONFIG
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.fake_iterable import FakeIterable
+
+STREAMS = ("email_send", "email_open", "email_click", "users")
+
+
+def _catalog(tap: TapIterable, selected: t.Iterable[str]) -> dict:
+    catalog = tap.catalog_dict
+
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if not metadata["breadcrumb"]:
+                metadata["metadata"]["selected"] = entry["tap_stream_id"] in selected
+
+    return catalog
+
+
+@pytest.mark.parametrize(
+    ("selected", "expected"),
+    [
+        pytest.param(["users"], ["users"], id="export"),
+        pytest.param(["list_users"], ["list_users", "lists"], id="child"),
+        pytest.param(
+            ["metadata", "lists"],
+            ["_metadata", "_metadata_tables", "lists", "metadata"],
+            id="grandchild",
+        ),
+    ],
+)
+def test_load_selected_streams(selected: list[str], expected: list[str]):
+    catalog = _catalog(TapIterable(config=BASE_CONFIG), selected)
+    tap = TapIterable(config=BASE_CONFIG, catalog=catalog)
+
+    assert set(tap.streams) == set(expected)
+    assert set(tap.catalog) == set(expected)
+
+
+def test_load_streams_missing_from_catalog():
+    catalog = _catalog(TapIterable(config=BASE_CONFIG), ["users"])
+    catalog["streams"] = [s for s in catalog["streams"] if s["stream"] != "lists"]
+    tap = TapIterable(config=BASE_CONFIG, catalog=catalog)
+
+    assert set(tap.streams) == {"lists", "users"}
+
+
+@pytest.mark.parametrize(
+    "iterable",
+    [{"records_per_hour": 10, "latency": 0.01}],
+    indirect=True,
+)
+def test_sync_streams_concurrently(
+    iterable: FakeIterable,
+    capsys: pytest.CaptureFixture,
+):
+    config = {
+        **BASE_CONFIG,
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-01-02T00:00:00Z",
+        "export_window_hours": 6,
+        "max_parallel_streams": 4,
+    }
+    catalog = _catalog(TapIterable(config=config, validate_config=False), STREAMS)
+    capsys.readouterr()
+
+    tap = TapIterable(config=config, catalog=catalog, validate_config=False)
+    tap.sync_all()
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    records = [m for m in messages if m["type"] == "RECORD"]
+
+    assert {r["stream"] for r in records} == set(STREAMS)
+    assert len(records) == len(STREAMS) * 24 * 10
+
+    # the first window of each stream is requested as the first stream is synced
+    requested = [parse_qs(urlparse(url).query) for _, url in iterable.requests]
+    assert {q["dataTypeName"][0] for q in requested[: len(STREAMS)]} == {
+        "emailSend",
+        "emailOpen",
+        "emailClick",
+        "user",
+    }
+
+    bookmarks = messages[-1]["value"]["bookmarks"]
+    assert {name: bookmarks[name]["replication_key_value"] for name in STREAMS} == (
+        dict.fromkeys(STREAMS, "2024-01-02T00:00:00+00:00")
+    )
+
+
+@pytest.mark.parametrize(
+    "iterable",
+    [{"records_per_hour": 10, "latency": 0.3}],
+    indirect=True,
+)
+def test_sync_streams_concurrently_wall_time(
+    iterable: FakeIterable,
+    capsys: pytest.CaptureFixture,
+):
+    config = {
+        **BASE_CONFIG,
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-01-02T00:00:00Z",
+        "export_window_hours": 6,
+        "max_parallel_streams": len(STREAMS),
+        "max_parallel_downloads": 4,
+    }
+    catalog = _catalog(TapIterable(config=config, validate_config=False), STREAMS)
+    capsys.readouterr()
+
+    tap = TapIterable(config=config, catalog=catalog, validate_config=False)
+    start = time.monotonic()
+    tap.sync_all()
+    elapsed = time.monotonic() - start
+
+    # the windows of the streams synced next are downloaded while the first stream
+    # is synced, so the sync takes about as long as a single stream, rather than as
+    # long as each stream in turn
+    assert len(iterable.requests) == len(STREAMS) * 4
+    assert elapsed < 2 * iterable.latency
+
+
+@pytest.mark.parametrize(
+    "iterable",
+    [{"records_per_hour": 10, "latency": 2}],
+    indirect=True,
+)
+def test_sync_streams_concurrently_failed(
+    iterable: FakeIterable,
+    capsys: pytest.CaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    config = {
+        **BASE_CONFIG,
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-01-02T00:00:00Z",
+        "export_window_hours": 6,
+        "max_parallel_streams": 4,
+        "max_parallel_downloads": 2,
+    }
+    catalog = _catalog(TapIterable(config=config, validate_config=False), STREAMS)
+    capsys.readouterr()
+
+    tap = TapIterable(config=config, catalog=catalog, validate_config=False)
+    first = next(s for s in tap.streams.values() if s.selected)
+
+    def request_records(_context):
+        # wait for records of the streams synced next to be requested
+        while iterable.connections < len(STREAMS) - 1:
+            time.sleep(0.01)
+
+        msg = "Sync failed"
+        raise RuntimeError(msg)
+        yield
+
+    monkeypatch.setattr(first, "request_records", request_records)
+    start = time.monotonic()
+
+    with pytest.raises(RuntimeError, match="Sync failed"):
+        tap.sync_all()
+
+    # records requested ahead are abandoned, rather than waited for
+    assert time.monotonic() - start < iterable.latency
+
+    def running() -> list[threading.Thread]:
+        return [t for t in threading.enumerate() if t.name.startswith(STREAMS)]
+
+    deadline = time.monotonic() + 1
+
+    while running() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert not running()
+
+
+@pytest.mark.parametrize(
+    "iterable",
+    [{"records_per_hour": 10, "latency": 0.05}],
+    indirect=True,
+)
+def test_sync_stats(
+    iterable: FakeIterable,
+    capsys: pytest.CaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+):
+    config = {
+        **BASE_CONFIG,
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-01-02T00:00:00Z",
+        "export_window_hours": 12,
+        "metrics_textfile": str(tmp_path / "tap_iterable.prom"),
+    }
+    selected = ["users", "lists"]
+    catalog = _catalog(TapIterable(config=config, validate_config=False), selected)
+    capsys.readouterr()
+
+    tap = TapIterable(config=config, catalog=catalog, validate_config=False)
+
+    points = []
+    logger = metrics.get_metrics_logger()
+    monkeypatch.setattr(
+        logger,
+        "info",
+        lambda _, point: points.append(json.loads(str(point))),
+    )
+    tap.sync_all()
+
+    decoded = [
+        p
+        for p in points
+        if p["metric"] == stats.Metric.RECORDS_DECODED
+        and p["tags"]["stream"] == "users"
+    ]
+
+    # one per window, then the stream total
+    assert [p["value"] for p in decoded] == [120, 120, 240]
+    assert decoded[0]["tags"]["window_end"] == "2024-01-01T12:00:00+00:00"
+    assert "window_end" not in decoded[-1]["tags"]
+
+    # each response is recorded once, for its window, then for the stream
+    wait = [
+        p["value"]
+        for p in points
+        if p["metric"] == stats.Metric.WAIT_DURATION and p["tags"]["stream"] == "users"
+    ]
+
+    assert len(wait) == 3
+    assert wait[-1] == pytest.approx(sum(wait[:-1]), abs=1e-5)
+    assert wait[-1] >= 2 * iterable.latency
+
+    textfile = (tmp_path / "tap_iterable.prom").read_text()
+    assert 'tap_iterable_records_decoded{stream="users"} 240' in textfile
+    assert 'tap_iterable_records_decoded{stream="lists"} 3' in textfile
+
+
+@pytest.mark.parametrize("iterable", [{"records_per_hour": 10}], indirect=True)
+def test_profile(
+    iterable: FakeIterable,  # noqa: ARG001
+    capsys: pytest.CaptureFixture,
+    tmp_path: Path,
+):
+    config = {
+        **BASE_CONFIG,
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-01-02T00:00:00Z",
+        "profile_dir": str(tmp_path),
+    }
+    selected = ["users", "list_users"]
+    catalog = _catalog(TapIterable(config=config, validate_config=False), selected)
+    capsys.readouterr()
+
+    tap = TapIterable(config=config, catalog=catalog, validate_config=False)
+    tap.sync_all()
+
+    # child streams are profiled with their parent stream
+    assert {p.name for p in tmp_path.iterdir()} == {
+        "lists.prof",
+        "lists.tracemalloc",
+        "users.prof",
+        "users.tracemalloc",
+    }
+    assert tap.streams["users"].sync_stats.emit_duration
+
+
+@pytest.mark.parametrize("iterable", [{"records_per_hour": 10}], indirect=True)
+def test_shared_transport(
+    iterable: FakeIterable,
+    capsys: pytest.CaptureFixture,
+):
+    config = {
+        **BASE_CONFIG,
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-01-02T00:00:00Z",
+        "export_window_hours": 6,
+    }
+    catalog = _catalog(TapIterable(config=config, validate_config=False), STREAMS)
+    capsys.readouterr()
+
+    tap = TapIterable(config=config, catalog=catalog, validate_config=False)
+    users, email_send = tap.streams["users"], tap.streams["email_send"]
+
+    assert users.requests_session is email_send.requests_session
+    assert users.authenticator is email_send.authenticator
+
+    tap.sync_all()
+
+    # a single connection is kept alive and reused by every stream
+    assert len(iterable.requests) == len(STREAMS) * 4
+    assert iterable.connections == 1
+
+
+@pytest.mark.parametrize(
+    ("config", "pool_size"),
+    [
+        pytest.param({}, 10, id="default"),
+        pytest.param(
+            {"max_parallel_streams": 4, "max_parallel_downloads": 8},
+            32,
+            id="parallel",
+        ),
+        pytest.param({"http_pool_size": 4}, 4, id="configured"),
+    ],
+)
+def test_transport_pool_size(config: dict, pool_size: int):
+    tap = TapIterable(config={**BASE_CONFIG, **config})
+
+    assert tap.transport.pool_size == pool_size
+    assert tap.transport.timeout == (30, 300)
+
+
+def test_rate_limits():
+    # no paths are limited unless configured
+    tap = TapIterable(config=BASE_CONFIG)
+    assert tap.rate_limiter.get("/export/data.json") is None
+
+    tap = TapIterable(config={**BASE_CONFIG, "rate_limits": {"/export/data.json": 4}})
+    assert tap.rate_limiter.get("/export/data.json").rate == pytest.approx(4 / 60)
+
+
+@pytest.mark.parametrize(
+    ("selected", "mediums"),
+    [
+        pytest.param(["email_templates"], ["Email"], id="email_templates"),
+        pytest.param(
+            ["templates", "email_templates"],
+            ["Email", "Push", "InApp", "SMS"],
+            id="templates",
+        ),
+    ],
+)
+def test_prune_unneeded_contexts(
+    iterable: FakeIterable,
+    capsys: pytest.CaptureFixture,
+    selected: list[str],
+    mediums: list[str],
+):
+    catalog = _catalog(TapIterable(config=BASE_CONFIG), selected)
+    capsys.readouterr()
+
+    tap = TapIterable(config=BASE_CONFIG, catalog=catalog)
+    tap.sync_all()
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    records = [m["record"] for m in messages if m["type"] == "RECORD"]
+
+    # templates are only requested for mediums needed by a selected stream
+    requested = [parse_qs(urlparse(url).query) for _, url in iterable.requests]
+    assert [q["messageMedium"][0] for q in requested if "messageMedium" in q] == (
+        mediums
+    )
+    assert len([r for r in records if "html" in r]) == iterable.templates
+    assert len(iterable.requests) == len(mediums) + iterable.templates
+
+
+@pytest.mark.parametrize("iterable", [{"records_per_hour": 10}], indirect=True)
+def test_sync_streams_concurrently_state(
+    iterable: FakeIterable,  # noqa: ARG001
+    capsys: pytest.CaptureFixture,
+):
+    selected = [
+        "email_bounce",
+        "email_click",
+        "email_complaint",
+        "email_open",
+        "email_send",
+        "email_send_skip",
+        "email_subscribe",
+        "email_unsubscribe",
+    ]
+    config = {
+        **BASE_CONFIG,
+        "start_date": "2024-01-01T00:00:00Z",
+        "end_date": "2024-01-02T00:00:00Z",
+        "export_window_hours": 1,
+        "max_parallel_streams": len(selected),
+    }
+    catalog = _catalog(TapIterable(config=config, validate_config=False), selected)
+    capsys.readouterr()
+
+    # switch threads as often as possible, to interleave state changes
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    try:
+        tap = TapIterable(config=config, catalog=catalog, validate_config=False)
+        tap.sync_all()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    states = [m["value"] for m in messages if m["type"] == "STATE"]
+
+    # bookmarks of every stream are written, and only ever advance
+    latest: dict[str, str] = {}
+
+    for state in states:
+        for name, bookmark in state["bookmarks"].items():
+            value = bookmark.get("replication_key_value")
+
+            if value:
+                assert value >= latest.get(name, value)
+                latest[name] = value
+
+    assert latest == dict.fromkeys(selected, "2024-01-02T00:00:00+00:00")
+
+    # as is the final state, for every stream
+    bookmarks = states[-1]["bookmarks"]
+    assert {name: bookmarks[name]["replication_key_value"] for name in selected} == (
+        latest
+    )
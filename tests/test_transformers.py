@@ -0,0 +1,34 @@
+"""Tests record transformers."""
+
+from __future__ import annotations
+
+from tap_iterable import transformers
+
+
+def test_timestamps_to_iso():
+    transform = transformers.timestamps_to_iso(["createdAt", "updatedAt"])
+
+    assert transform({"createdAt": 1704067200000, "updatedAt": "2024-01-01"}) == {
+        "createdAt": "2024-01-01T00:00:00+00:00",
+        "updatedAt": "2024-01-01",
+    }
+
+
+def test_chain():
+    transform = transformers.chain(
+        transformers.decode_json_strings(["transactionalData"]),
+        transformers.nest_unknown_properties(["email"], "dataFields"),
+    )
+
+    assert transform(
+        {"email": "user@example.com", "transactionalData": '{"a": 1}', "b": 2}
+    ) == {
+        "email": "user@example.com",
+        "dataFields": {"transactionalData": {"a": 1}, "b": 2},
+    }
+
+
+def test_chain_identity():
+    assert transformers.chain(transformers.timestamps_to_iso([])) is (
+        transformers.identity
+    )